@@ -0,0 +1,40 @@
+# SPDX-FileCopyrightText: 2025 Frederic Ruget <fred@atlant.is> (GitHub: @douzebis)
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Minimal BER-TLV parser for PIV data objects (single-byte tags).
+"""
+
+from __future__ import annotations
+
+
+def parse_tlv(buf: bytes | memoryview, offset: int = 0) -> tuple[int, memoryview, int]:
+    """Parse one TLV at `offset`.
+
+    Returns (tag, value, next_offset); `value` is a view into `buf`, no copy.
+    Short-form (< 0x80) and long-form (0x81, 0x82, ...) lengths are supported.
+    Raises ValueError on truncated input.
+    """
+    mv = memoryview(buf)
+    end = len(mv)
+    if offset + 2 > end:
+        raise ValueError(f"TLV header truncated at offset {offset}")
+
+    tag = mv[offset]
+    length = mv[offset + 1]
+    pos = offset + 2
+
+    if length & 0x80:
+        n = length & 0x7F
+        if n == 0 or pos + n > end:
+            raise ValueError(f"invalid long-form length at offset {offset + 1}")
+        length = int.from_bytes(mv[pos:pos + n], 'big')
+        pos += n
+
+    if pos + length > end:
+        raise ValueError(
+            f"TLV 0x{tag:02x} length {length} exceeds buffer ({end - pos} bytes left)"
+        )
+
+    return tag, mv[pos:pos + length], pos + length
@@ -0,0 +1,19 @@
+# SPDX-FileCopyrightText: 2025 Frederic Ruget <fred@atlant.is> (GitHub: @douzebis)
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Shared constants and helpers for the LED flash/blink mock-up scripts.
+"""
+
+from __future__ import annotations
+
+from _device_cache import find_device
+
+__all__ = ['GET_VERSION_APDU', 'SELECT_PIV_APDU', 'find_device']
+
+# SELECT PIV application (AID A0 00 00 03 08)
+SELECT_PIV_APDU = bytes([0x00, 0xA4, 0x04, 0x00, 0x05, 0xA0, 0x00, 0x00, 0x03, 0x08])
+
+# GET VERSION - quick, and enough to flash the LED
+GET_VERSION_APDU = bytes([0x00, 0xF7, 0x00, 0x00])
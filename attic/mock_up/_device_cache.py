@@ -0,0 +1,117 @@
+# SPDX-FileCopyrightText: 2025 Frederic Ruget <fred@atlant.is> (GitHub: @douzebis)
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Device enumeration helpers for the mock-up scripts.
+
+USB/PCSC enumeration dominates the run time of the mock-up scripts; repeated
+calls within a few seconds reuse the previous result, and serial lookups
+stop probing as soon as the key is found.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
+
+_cache: tuple[float, list[tuple[Any, Any]]] | None = None
+# (timestamp, devices, serial -> (device, info))
+_PcscEntry = tuple[float, list[tuple[Any, Any]], dict[int, tuple[Any, Any]]]
+_pcsc_cache: _PcscEntry | None = None
+
+
+def list_all_devices_cached(ttl: float = 5.0) -> list[tuple[Any, Any]]:
+    """Return `list_all_devices()`, reusing a result younger than `ttl` seconds."""
+    global _cache
+    now = time.monotonic()
+    if _cache is not None and now - _cache[0] < ttl:
+        return _cache[1]
+
+    from ykman.device import list_all_devices
+
+    devices = list(list_all_devices())
+    _cache = (now, devices)
+    return devices
+
+
+def _read_pcsc_info(device: Any) -> Any | None:
+    """Read the DeviceInfo of one PC/SC device, or None if it cannot be opened."""
+    from yubikit.core.smartcard import SmartCardConnection
+    from yubikit.support import read_info
+
+    try:
+        with device.open_connection(SmartCardConnection) as conn:
+            return read_info(conn, device.pid)
+    except Exception:
+        return None
+
+
+def _refresh_pcsc_cache(ttl: float) -> _PcscEntry:
+    """Return the PC/SC cache entry, re-enumerating if older than `ttl`."""
+    global _pcsc_cache
+    now = time.monotonic()
+    if _pcsc_cache is not None and now - _pcsc_cache[0] < ttl:
+        return _pcsc_cache
+
+    from ykman.pcsc import list_devices
+
+    handles = list(list_devices())
+    devices: list[tuple[Any, Any]] = []
+    if handles:
+        with ThreadPoolExecutor(max_workers=len(handles)) as pool:
+            infos = list(pool.map(_read_pcsc_info, handles))
+        devices = [(d, i) for d, i in zip(handles, infos) if i is not None]
+    by_serial = {i.serial: (d, i) for d, i in devices if i.serial is not None}
+    _pcsc_cache = (now, devices, by_serial)
+    return _pcsc_cache
+
+
+def list_pcsc_devices_cached(ttl: float = 5.0) -> list[tuple[Any, Any]]:
+    """Return (device, info) for every YubiKey reachable over PC/SC.
+
+    Unlike `list_all_devices()`, which opens each key in turn, the device
+    info reads run concurrently: they are PC/SC round trips that release the
+    GIL, so N keys take about as long as one.  Only the CCID interface is
+    considered.  Results younger than `ttl` seconds are reused.
+    """
+    return _refresh_pcsc_cache(ttl)[1]
+
+
+def pcsc_device_by_serial(serial: int, ttl: float = 5.0) -> tuple[Any, Any] | None:
+    """Return the cached (device, info) for `serial`, or None if absent."""
+    return _refresh_pcsc_cache(ttl)[2].get(serial)
+
+
+def invalidate_device_cache() -> None:
+    """Forget the cached enumerations, e.g. after a key was plugged or removed."""
+    global _cache, _pcsc_cache
+    _cache = None
+    _pcsc_cache = None
+
+
+def safe_list_devices(ttl: float = 5.0) -> Iterator[tuple[Any, Any]]:
+    """Yield (device, info) for the PC/SC YubiKeys whose info could be read.
+
+    Readers that raise while the info is read (empty or wedged) are skipped
+    right there, instead of stalling or aborting the caller's enumeration.
+    Results younger than `ttl` seconds are reused.
+    """
+    yield from list_pcsc_devices_cached(ttl)
+
+
+def find_device(serial: int) -> tuple[Any, Any] | None:
+    """Find the YubiKey with `serial`, probing PC/SC readers only until it matches.
+
+    `list_all_devices()` reads the device info of every attached key over
+    every transport; this opens one CCID reader at a time and stops at the
+    first match.  Returns (device, info), or None when no key matches.
+    """
+    from ykman.pcsc import list_devices
+
+    for device in list_devices():
+        info = _read_pcsc_info(device)
+        if info is not None and info.serial == serial:
+            return device, info
+    return None
@@ -0,0 +1,35 @@
+# SPDX-FileCopyrightText: 2025 Frederic Ruget <fred@atlant.is> (GitHub: @douzebis)
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Throttled carriage-return progress line for the flash/blink loops.
+
+Set PROGRESS=0 in the environment to suppress progress output entirely.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+
+class ProgressWriter:
+    """Rewrite a `\\r` progress line at most once every `interval` seconds."""
+
+    def __init__(self, interval: float = 0.1) -> None:
+        self._interval = interval
+        self._last = float('-inf')
+        self._enabled = os.environ.get('PROGRESS', '1') != '0'
+
+    def update(self, fmt: str, *args: object) -> None:
+        """Write `fmt % args` unless the previous update is too recent."""
+        if not self._enabled:
+            return
+        now = time.monotonic()
+        if now - self._last < self._interval:
+            return
+        self._last = now
+        sys.stdout.write('\r' + fmt % args)
+        sys.stdout.flush()
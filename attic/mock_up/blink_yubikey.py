@@ -14,35 +14,18 @@ from __future__ import annotations
 
 import sys
 import time
-from typing import Protocol, Tuple, cast
-
-
-class PcscConnection(Protocol):
-    """Protocol for pyscard connection object (accessed via conn.connection)."""
-    def transmit(self, apdu: list[int]) -> Tuple[list[int], int, int]:
-        """Send APDU and receive response."""
-        ...
-
-
-class ScardSmartCardConnection(Protocol):
-    """Protocol for ykman.pcsc.ScardSmartCardConnection."""
-    connection: PcscConnection
-
-    def send_and_receive(self, apdu: bytes) -> Tuple[bytes, int]:
-        """Send APDU and receive response (yubikit API)."""
-        ...
 
+from _common import GET_VERSION_APDU
+from _device_cache import list_all_devices_cached
+from yubikit.core.smartcard import SmartCardConnection
 
 def main() -> int:
-    from ykman.device import list_all_devices
-    from yubikit.core.smartcard import SmartCardConnection
-
     print("\n" + "=" * 70)
     print("YubiKey LED Blinking Demonstration")
     print("=" * 70)
     print()
 
-    devices = list(list_all_devices())
+    devices = list_all_devices_cached()
     if not devices:
         print("✗ No YubiKeys found")
         return 1
@@ -64,18 +47,19 @@ def main() -> int:
     print()
 
     try:
-        for i in range(20):
-            with device.open_connection(SmartCardConnection) as _conn:
-                conn = cast(ScardSmartCardConnection, _conn)
+        # One connection for all operations: each open costs a full PC/SC
+        # connect/disconnect handshake, while the transmit alone is enough
+        # to flash the LED.
+        with device.open_connection(SmartCardConnection) as conn:
+            for i in range(20):
                 # Quick version read - causes LED flash
-                apdu = [0x00, 0xF7, 0x00, 0x00]
-                response, sw1, sw2 = conn.connection.transmit(apdu)
+                response, sw = conn.send_and_receive(GET_VERSION_APDU)
 
-            # Progress indicator
-            if (i + 1) % 5 == 0:
-                print(f"  {i+1}/20 operations complete")
+                # Progress indicator
+                if (i + 1) % 5 == 0:
+                    print(f"  {i+1}/20 operations complete")
 
-            time.sleep(0.15)
+                time.sleep(0.15)
 
         print()
         print("=" * 70)
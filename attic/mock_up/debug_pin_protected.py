@@ -6,10 +6,12 @@
 
 """Debug script to check PIN-protected management key retrieval"""
 
+import subprocess
 import sys
 sys.path.insert(0, 'src')
 
-from ykman.device import list_all_devices
+from _bertlv import parse_tlv
+from _device_cache import list_all_devices_cached
 from yubikit.core.smartcard import SmartCardConnection
 from yubikit.piv import PivSession
 
@@ -17,7 +19,7 @@ from yubikit.piv import PivSession
 pin = input("Enter PIN: ")
 
 # Find device
-devices = list_all_devices()
+devices = list_all_devices_cached()
 if not devices:
     print("No YubiKeys found")
     sys.exit(1)
@@ -46,38 +48,38 @@ with device.open_connection(SmartCardConnection) as conn:
         print(f"✗ Failed to read PRINTED object: {e}")
         sys.exit(1)
     
-    # Parse TLV
-    if printed_data[0] != 0x88:
-        print(f"✗ Invalid outer tag: expected 0x88, got 0x{printed_data[0]:02x}")
-        sys.exit(1)
-    
-    print(f"✓ Outer tag: 0x{printed_data[0]:02x}")
-    
-    outer_len = printed_data[1]
-    print(f"✓ Outer length: {outer_len}")
-    
-    inner_data = printed_data[2:2 + outer_len]
-    print(f"  Inner data: {inner_data.hex()}")
-    
-    if inner_data[0] != 0x89:
-        print(f"✗ Invalid inner tag: expected 0x89, got 0x{inner_data[0]:02x}")
+    # Parse TLV: 88 <len> { 89 <len> <key> }
+    try:
+        tag, inner_data, _ = parse_tlv(printed_data)
+        if tag != 0x88:
+            print(f"✗ Invalid outer tag: expected 0x88, got 0x{tag:02x}")
+            sys.exit(1)
+
+        print(f"✓ Outer tag: 0x{tag:02x}")
+        print(f"✓ Outer length: {len(inner_data)}")
+        print(f"  Inner data: {inner_data.hex()}")
+
+        tag, key_view, _ = parse_tlv(inner_data)
+        if tag != 0x89:
+            print(f"✗ Invalid inner tag: expected 0x89, got 0x{tag:02x}")
+            sys.exit(1)
+    except ValueError as e:
+        print(f"✗ Malformed PRINTED object: {e}")
         sys.exit(1)
-    
-    print(f"✓ Inner tag: 0x{inner_data[0]:02x} (AES key)")
-    
-    key_len = inner_data[1]
-    print(f"✓ Key length: {key_len}")
-    
-    key_bytes = inner_data[2:2 + key_len]
-    print(f"✓ Key extracted ({len(key_bytes)} bytes)")
-    print(f"  Key hex: {key_bytes.hex()}")
-    
-    management_key_hex = key_bytes.hex()
+
+    print(f"✓ Inner tag: 0x{tag:02x} (AES key)")
+    print(f"✓ Key length: {len(key_view)}")
+
+    # Hex-encode straight from the view: no intermediate bytes copy, and
+    # the same string serves both display and the --key argument.
+    management_key_hex = key_view.hex()
+    print(f"✓ Key extracted ({len(key_view)} bytes)")
+    print(f"  Key hex: {management_key_hex}")
+
     print(f"\n✓ Management key: {management_key_hex}")
     print(f"  Length: {len(management_key_hex)} characters")
 
 print("\nNow testing with yubico-piv-tool...")
-import subprocess
 
 # Get reader name
 reader = device.fingerprint
@@ -99,10 +101,11 @@ try:
         check=True,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
+        text=True,
     )
     print("✓ yubico-piv-tool authentication successful!")
-    print(result.stdout.decode())
+    print(result.stdout)
 except subprocess.CalledProcessError as e:
     print(f"✗ yubico-piv-tool failed:")
-    print(f"  stdout: {e.stdout.decode()}")
-    print(f"  stderr: {e.stderr.decode()}")
+    print(f"  stdout: {e.stdout}")
+    print(f"  stderr: {e.stderr}")
@@ -12,8 +12,12 @@ Checks permissions, device enumeration, and compares with PIV access.
 
 from __future__ import annotations
 
+import os
 import sys
 
+# uevent keys reported for each hidraw device
+_UEVENT_KEYS = frozenset({'HID_NAME', 'PRODUCT'})
+
 
 def check_fido_hid_devices() -> None:
     """Check if FIDO HID devices can be enumerated."""
@@ -32,10 +36,11 @@ def check_fido_hid_devices() -> None:
         print()
 
         for i, device in enumerate(devices):
+            desc = device.descriptor
             print(f"Device {i}:")
-            print(f"  Descriptor: {device.descriptor}")
-            print(f"  Product: {device.descriptor.product_name if hasattr(device.descriptor, 'product_name') else 'N/A'}")
-            print(f"  Path: {device.descriptor.path if hasattr(device.descriptor, 'path') else 'N/A'}")
+            print(f"  Descriptor: {desc}")
+            print(f"  Product: {getattr(desc, 'product_name', 'N/A')}")
+            print(f"  Path: {getattr(desc, 'path', 'N/A')}")
             print()
 
         if not devices:
@@ -65,10 +70,10 @@ def check_piv_smartcard_devices() -> None:
     print()
 
     try:
-        from ykman.device import list_all_devices
+        from _device_cache import safe_list_devices
 
         print("Attempting to list YubiKey devices via ykman (PIV/SmartCard)...")
-        devices = list(list_all_devices())
+        devices = list(safe_list_devices())
 
         print(f"Found {len(devices)} YubiKey device(s)")
         print()
@@ -81,10 +86,12 @@ def check_piv_smartcard_devices() -> None:
             print(f"  Fingerprint (reader name): {device.fingerprint}")
 
             # Try to access USB information
-            if hasattr(device, '_device'):
-                print(f"  Internal device: {getattr(device, '_device')}")
-            if hasattr(device, '__dict__'):
-                print(f"  Device attributes: {[k for k in device.__dict__.keys() if not k.startswith('_')]}")
+            internal = getattr(device, '_device', None)
+            if internal is not None:
+                print(f"  Internal device: {internal}")
+            instance_attrs = getattr(device, '__dict__', None)
+            if instance_attrs is not None:
+                print(f"  Device attributes: {[k for k in instance_attrs if not k.startswith('_')]}")
 
             print()
 
@@ -102,47 +109,50 @@ def check_raw_hid_access() -> None:
     print("=" * 70)
     print()
 
-    import os
-    import glob
-
     print("Checking /dev/hidraw* devices...")
-    hidraw_devices = glob.glob("/dev/hidraw*")
+    with os.scandir("/dev") as it:
+        hidraw_devices = sorted(
+            (e for e in it if e.name.startswith("hidraw")),
+            key=lambda e: e.name,
+        )
 
     print(f"Found {len(hidraw_devices)} hidraw device(s)")
     print()
 
-    for hidraw in sorted(hidraw_devices):
-        stat = os.stat(hidraw)
-        readable = os.access(hidraw, os.R_OK)
-        writable = os.access(hidraw, os.W_OK)
-
-        print(f"{hidraw}:")
-        print(f"  Mode: {oct(stat.st_mode)}")
-        print(f"  Owner: UID {stat.st_uid}, GID {stat.st_gid}")
+    any_rw = False
+    for entry in hidraw_devices:
+        st = entry.stat()
+        # access(), not the mode bits: udev's uaccess grants hidraw access
+        # through POSIX ACLs and leaves the mode at 0600 root:root
+        readable = os.access(entry.path, os.R_OK)
+        writable = os.access(entry.path, os.W_OK)
+        any_rw = any_rw or (readable and writable)
+
+        print(f"{entry.path}:")
+        print(f"  Mode: {oct(st.st_mode)}")
+        print(f"  Owner: UID {st.st_uid}, GID {st.st_gid}")
         print(f"  Readable: {readable}")
         print(f"  Writable: {writable}")
 
-        # Try to read device info
+        # Try to read device info (vendor/product) from sysfs
+        uevent_path = f"/sys/class/hidraw/{entry.name}/device/uevent"
         try:
-            # Read from sysfs
-            device_num = hidraw.replace("/dev/hidraw", "")
-            sysfs_path = f"/sys/class/hidraw/hidraw{device_num}/device"
-
-            if os.path.exists(sysfs_path):
-                # Try to get vendor/product
-                uevent_path = f"{sysfs_path}/uevent"
-                if os.path.exists(uevent_path):
-                    with open(uevent_path, 'r') as f:
-                        uevent = f.read()
-                        for line in uevent.split('\n'):
-                            if 'HID_NAME' in line or 'PRODUCT' in line:
-                                print(f"  {line}")
+            with open(uevent_path, 'r') as f:
+                found = 0
+                for line in f:
+                    if line.split('=', 1)[0] in _UEVENT_KEYS:
+                        print(f"  {line.rstrip()}")
+                        found += 1
+                        if found == len(_UEVENT_KEYS):
+                            break
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"  Error reading sysfs: {e}")
 
         print()
 
-    if hidraw_devices and not any(os.access(h, os.R_OK | os.W_OK) for h in hidraw_devices):
+    if hidraw_devices and not any_rw:
         print("⚠ HID devices exist but you don't have read/write access!")
         print()
         print("Solution options:")
@@ -13,29 +13,97 @@ devices by correlating their USB device paths.
 
 from __future__ import annotations
 
+import functools
+import io
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import TextIO
 
+from _device_cache import safe_list_devices
+from fido2.ctap2 import Ctap2
+from fido2.hid import CtapHidDevice
 
-def extract_usb_info_from_piv() -> list[dict]:
+# Attributes probed on ykman / fido2 device objects
+_PIV_PROBE_ATTRS = frozenset({
+    'transport', 'path', 'location', 'port', 'bus', 'address',
+    'pid', 'descriptor',
+})
+_FIDO_PROBE_ATTRS = frozenset({
+    'path', 'location', 'port', 'bus', 'address', 'device_path',
+})
+_FIDO_DESCRIPTOR_ATTRS = frozenset({
+    'path', 'product_name', 'serial_number', 'vendor_id',
+    'product_id', 'usage_page', 'usage',
+})
+
+# USB topology in sysfs-style paths: <bus>-<port>[.<port>...], e.g. "1-2.4"
+_USB_BUS_PORT_RE = re.compile(r'(\d+)-(\d+(?:\.\d+)*)')
+
+
+@functools.lru_cache(maxsize=None)
+def _class_attrs(cls: type) -> frozenset[str]:
+    """Attribute names defined anywhere in the MRO of `cls`."""
+    return frozenset(name for klass in cls.__mro__ for name in vars(klass))
+
+
+def _attr_names(obj: object) -> set[str]:
+    """Attribute names of `obj`, like dir() but without the per-call sort."""
+    return _class_attrs(type(obj)) | getattr(obj, '__dict__', {}).keys()
+
+
+# CTAP2 GET_INFO results keyed by (vendor_id, product_id, firmware version);
+# AAGUID and versions are fixed per model and firmware, so one round-trip per
+# model/firmware.  Options are per key (e.g. clientPin), so they are not kept.
+_ctap2_info_cache: dict[tuple[int, int, tuple[int, int, int]], dict] = {}
+
+
+def _ctap2_info(device: CtapHidDevice) -> dict:
+    """Return the CTAP2 info of `device`, issuing GET_INFO only on cache miss.
+
+    'options' is present only when GET_INFO was sent to this very device.
+    """
+    desc = device.descriptor
+    # From the CTAPHID_INIT response, so known without a round-trip
+    key = (desc.vendor_id, desc.product_id, device.device_version)
+    cached = _ctap2_info_cache.get(key)
+    if cached is not None:
+        return cached
+    info = Ctap2(device).info
+    _ctap2_info_cache[key] = {
+        'aaguid': info.aaguid.hex(),
+        'versions': list(info.versions),
+    }
+    return {**_ctap2_info_cache[key], 'options': dict(info.options)}
+
+
+def _usb_bus_port(path: object) -> tuple[str, str] | None:
+    """Extract the (bus, port chain) of a device path, if it has one.
+
+    The last match is the deepest node, e.g. "1-2.4" in ".../1-2/1-2.4:1.1".
+    """
+    found = _USB_BUS_PORT_RE.findall(str(path))
+    return found[-1] if found else None
+
+
+def extract_usb_info_from_piv(out: TextIO = sys.stdout) -> list[dict]:
     """Extract USB information from PIV/SmartCard devices."""
-    print("=" * 70)
-    print("PIV Device USB Information")
-    print("=" * 70)
-    print()
+    print("=" * 70, file=out)
+    print("PIV Device USB Information", file=out)
+    print("=" * 70, file=out)
+    print(file=out)
 
     piv_devices = []
 
     try:
-        from ykman.device import list_all_devices
-
-        devices = list(list_all_devices())
-        print(f"Found {len(devices)} YubiKey device(s) via PIV/SmartCard")
-        print()
+        devices = list(safe_list_devices())
+        print(f"Found {len(devices)} YubiKey device(s) via PIV/SmartCard", file=out)
+        print(file=out)
 
         for i, (device, info) in enumerate(devices):
-            print(f"Device {i}: Serial {info.serial}")
-            print(f"  Fingerprint (reader): {device.fingerprint}")
-            print(f"  Version: {info.version}")
+            print(f"Device {i}: Serial {info.serial}", file=out)
+            print(f"  Fingerprint (reader): {device.fingerprint}", file=out)
+            print(f"  Version: {info.version}", file=out)
 
             device_info = {
                 "serial": info.serial,
@@ -49,119 +117,108 @@ def extract_usb_info_from_piv() -> list[dict]:
             # Approach 1: Check _device attribute (internal)
             if hasattr(device, '_device'):
                 device_device = getattr(device, '_device')
-                print(f"  _device: {device_device}")
-                print(f"  _device type: {type(device_device)}")
+                print(f"  _device: {device_device}", file=out)
+                print(f"  _device type: {type(device_device)}", file=out)
                 device_info["_device"] = str(device_device)
 
                 # Check if _device has path/location info
                 if hasattr(device_device, '__dict__'):
-                    print(f"  _device attributes: {list(device_device.__dict__.keys())}")
-
-            # Approach 2: Check for transport-related attributes
-            for attr in ['transport', 'path', 'location', 'port', 'bus', 'address']:
-                if hasattr(device, attr):
-                    val = getattr(device, attr)
-                    print(f"  {attr}: {val}")
-                    device_info[attr] = str(val)
-
-            # Approach 3: Check device descriptor
-            if hasattr(device, 'descriptor'):
-                device_descriptor = getattr(device, 'descriptor')
-                print(f"  descriptor: {device_descriptor}")
-                device_info["descriptor"] = str(device_descriptor)
-
-            # Approach 4: Try to get pid
-            if hasattr(device, 'pid'):
-                print(f"  pid: {device.pid}")
-                device_info["pid"] = device.pid
+                    print(f"  _device attributes: {list(device_device.__dict__.keys())}", file=out)
+
+            # Approaches 2-4: transport-related attributes, descriptor, pid
+            # (single attribute snapshot, one getattr per present attribute)
+            device_attrs = _attr_names(device)
+            for attr in sorted(_PIV_PROBE_ATTRS & device_attrs):
+                val = getattr(device, attr)
+                print(f"  {attr}: {val}", file=out)
+                device_info[attr] = val if attr == 'pid' else str(val)
 
             # Approach 5: Check all attributes
-            all_attrs = [a for a in dir(device) if not a.startswith('_')]
-            print(f"  Public attributes: {all_attrs}")
+            all_attrs = sorted(a for a in device_attrs if not a.startswith('_'))
+            print(f"  Public attributes: {all_attrs}", file=out)
 
             piv_devices.append(device_info)
-            print()
+            print(file=out)
 
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error: {e}", file=out)
         import traceback
-        traceback.print_exc()
+        traceback.print_exc(file=out)
 
     return piv_devices
 
 
-def extract_usb_info_from_fido() -> list[dict]:
+def extract_usb_info_from_fido(out: TextIO = sys.stdout) -> list[dict]:
     """Extract USB information from FIDO HID devices."""
-    print()
-    print("=" * 70)
-    print("FIDO HID Device USB Information")
-    print("=" * 70)
-    print()
+    print(file=out)
+    print("=" * 70, file=out)
+    print("FIDO HID Device USB Information", file=out)
+    print("=" * 70, file=out)
+    print(file=out)
 
     fido_devices = []
 
     try:
-        from fido2.hid import CtapHidDevice
-
         devices = list(CtapHidDevice.list_devices())
-        print(f"Found {len(devices)} FIDO HID device(s)")
-        print()
+        print(f"Found {len(devices)} FIDO HID device(s)", file=out)
+        print(file=out)
 
         if not devices:
-            print("⚠ No FIDO HID devices found - permission issue?")
-            print("  Try running with sudo or fix udev rules")
+            print("⚠ No FIDO HID devices found - permission issue?", file=out)
+            print("  Try running with sudo or fix udev rules", file=out)
             return fido_devices
 
         for i, device in enumerate(devices):
-            print(f"Device {i}:")
+            print(f"Device {i}:", file=out)
 
             device_info = {}
 
+            device_attrs = _attr_names(device)
+
             # Descriptor information
-            if hasattr(device, 'descriptor'):
+            if 'descriptor' in device_attrs:
                 desc = device.descriptor
-                print(f"  descriptor: {desc}")
+                print(f"  descriptor: {desc}", file=out)
 
-                for attr in ['path', 'product_name', 'serial_number', 'vendor_id',
-                             'product_id', 'usage_page', 'usage']:
-                    if hasattr(desc, attr):
-                        val = getattr(desc, attr)
-                        print(f"  descriptor.{attr}: {val}")
-                        device_info[attr] = val
+                for attr in sorted(_FIDO_DESCRIPTOR_ATTRS & _attr_names(desc)):
+                    val = getattr(desc, attr)
+                    print(f"  descriptor.{attr}: {val}", file=out)
+                    device_info[attr] = val
 
             # Check for USB path/location
-            for attr in ['path', 'location', 'port', 'bus', 'address', 'device_path']:
-                if hasattr(device, attr):
-                    val = getattr(device, attr)
-                    print(f"  {attr}: {val}")
-                    device_info[attr] = val
+            for attr in sorted(_FIDO_PROBE_ATTRS & device_attrs):
+                val = getattr(device, attr)
+                print(f"  {attr}: {val}", file=out)
+                device_info[attr] = val
 
             # Check all public attributes
-            all_attrs = [a for a in dir(device) if not a.startswith('_')]
-            print(f"  Public attributes: {all_attrs}")
+            all_attrs = sorted(a for a in device_attrs if not a.startswith('_'))
+            print(f"  Public attributes: {all_attrs}", file=out)
 
             # Try CTAP2 to get more info
             try:
-                from fido2.ctap2 import Ctap2
-                ctap2 = Ctap2(device)
-                print(f"  CTAP2 info.aaguid: {ctap2.info.aaguid.hex()}")
-                print(f"  CTAP2 info.versions: {ctap2.info.versions}")
+                ctap2_info = _ctap2_info(device)
+                print(f"  CTAP2 info.aaguid: {ctap2_info['aaguid']}", file=out)
+                print(f"  CTAP2 info.versions: {ctap2_info['versions']}", file=out)
 
                 # Check if CTAP2 has any device/serial info
-                if hasattr(ctap2.info, 'options'):
-                    print(f"  CTAP2 info.options: {ctap2.info.options}")
+                if 'options' in ctap2_info:
+                    print(f"  CTAP2 info.options: {ctap2_info['options']}", file=out)
+                else:
+                    print("  CTAP2 info.options: (not queried; same model and "
+                          "firmware as an earlier device)", file=out)
 
-                device_info["aaguid"] = ctap2.info.aaguid.hex()
+                device_info["aaguid"] = ctap2_info['aaguid']
             except Exception as e:
-                print(f"  CTAP2 error: {e}")
+                print(f"  CTAP2 error: {e}", file=out)
 
             fido_devices.append(device_info)
-            print()
+            print(file=out)
 
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error: {e}", file=out)
         import traceback
-        traceback.print_exc()
+        traceback.print_exc(file=out)
 
     return fido_devices
 
@@ -191,16 +248,34 @@ def analyze_correlation(piv_devices: list[dict], fido_devices: list[dict]) -> No
     print("Strategy 1: USB Path Comparison")
     print("-" * 40)
 
+    # Index FIDO paths by USB (bus, port chain) once; paths without a
+    # recognizable USB location fall back to substring matching.
+    fido_by_bus_port: dict[tuple[str, str], list[str]] = {}
+    fido_unkeyed: list[str] = []
+    for fido in fido_devices:
+        fido_path = fido.get('path') or fido.get('device_path')
+        if not fido_path:
+            continue
+        fido_path = str(fido_path)
+        key = _usb_bus_port(fido_path)
+        if key is None:
+            fido_unkeyed.append(fido_path)
+        else:
+            fido_by_bus_port.setdefault(key, []).append(fido_path)
+
     for piv in piv_devices:
         piv_path = piv.get('path') or piv.get('device_path')
         if piv_path:
             print(f"PIV Serial {piv['serial']}: path = {piv_path}")
 
             # Try to match with FIDO devices
-            for fido in fido_devices:
-                fido_path = fido.get('path') or fido.get('device_path')
-                if fido_path and piv_path in str(fido_path):
-                    print(f"  ✓ Potential match: FIDO path = {fido_path}")
+            key = _usb_bus_port(piv_path)
+            if key is None:
+                matches = [p for p in fido_unkeyed if str(piv_path) in p]
+            else:
+                matches = fido_by_bus_port.get(key, [])
+            for fido_path in matches:
+                print(f"  ✓ Potential match: FIDO path = {fido_path}")
         else:
             print(f"PIV Serial {piv['serial']}: No path information")
 
@@ -271,11 +346,16 @@ def main() -> int:
     print("USB Device Path Correlation Investigation")
     print()
 
-    # Extract PIV device info
-    piv_devices = extract_usb_info_from_piv()
-
-    # Extract FIDO device info
-    fido_devices = extract_usb_info_from_fido()
+    # Extract PIV and FIDO device info concurrently (both are USB-bound);
+    # each worker writes to its own buffer to keep the output in order.
+    piv_out, fido_out = io.StringIO(), io.StringIO()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        piv_future = executor.submit(extract_usb_info_from_piv, piv_out)
+        fido_future = executor.submit(extract_usb_info_from_fido, fido_out)
+        piv_devices = piv_future.result()
+        fido_devices = fido_future.result()
+    sys.stdout.write(piv_out.getvalue())
+    sys.stdout.write(fido_out.getvalue())
 
     # Analyze correlation
     analyze_correlation(piv_devices, fido_devices)
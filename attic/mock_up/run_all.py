@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2025 Frederic Ruget <fred@atlant.is> (GitHub: @douzebis)
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Run the LED flash/blink mock-ups in a single interpreter.
+
+The ykman/yubikit import cost is paid once instead of once per script.
+
+Usage: python mock_up/run_all.py <serial_number>
+"""
+
+from __future__ import annotations
+
+import sys
+
+import blink_yubikey
+import test_fido2_touch
+import test_final_flash
+import test_flash_debug
+import test_led_blink
+import test_led_flash
+
+
+def main() -> int:
+    """Run every mock-up in turn; return the first non-zero exit status."""
+    if len(sys.argv) != 2:
+        print("Usage: python run_all.py <serial_number>")
+        return 1
+
+    serial_args = sys.argv[1:]
+    runs = [
+        ("test_final_flash", lambda: test_final_flash.main(serial_args)),
+        ("test_flash_debug", lambda: test_flash_debug.main(serial_args)),
+        ("test_led_flash", lambda: test_led_flash.main(serial_args)),
+        ("test_led_blink", test_led_blink.main),
+        ("blink_yubikey", blink_yubikey.main),
+        ("test_fido2_touch", test_fido2_touch.main),
+    ]
+
+    status = 0
+    for name, run in runs:
+        print(f"\n>>> {name}")
+        rc = run()
+        if rc and not status:
+            status = rc
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
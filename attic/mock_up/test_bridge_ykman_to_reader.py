@@ -17,6 +17,9 @@ from __future__ import annotations
 
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from _device_cache import safe_list_devices
 
 
 def get_readers_via_yubico_piv_tool() -> list[str]:
@@ -42,7 +45,7 @@ def get_serial_for_reader(reader: str) -> int | None:
             ['yubico-piv-tool', '-r', reader, '-a', 'status'],
             check=True,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,  # discarded on failure anyway
             text=True,
         )
 
@@ -58,11 +61,28 @@ def get_serial_for_reader(reader: str) -> int | None:
         return None
 
 
+def get_serials_for_readers(readers: list[str]) -> dict[str, int]:
+    """Get serial numbers for several readers with concurrent yubico-piv-tool runs.
+
+    Each reader needs its own `-r` invocation, so the processes are fanned out
+    over a thread pool: wall time is the slowest reader rather than the sum.
+    Readers that do not report a serial are omitted.
+    """
+    if not readers:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=len(readers)) as executor:
+        serials = executor.map(get_serial_for_reader, readers)
+        return {
+            reader: serial
+            for reader, serial in zip(readers, serials)
+            if serial is not None
+        }
+
+
 def get_devices_via_ykman() -> list[tuple[object, int, str]]:
     """Get devices via ykman API with serial numbers."""
-    from ykman.device import list_all_devices
-
-    devices = list(list_all_devices())
+    devices = list(safe_list_devices())
     result = []
 
     for device, info in devices:
@@ -71,13 +91,16 @@ def get_devices_via_ykman() -> list[tuple[object, int, str]]:
     return result
 
 
-def find_reader_for_serial(target_serial: int, readers: list[str]) -> str | None:
-    """Find the reader name that corresponds to a serial number."""
-    for reader in readers:
-        serial = get_serial_for_reader(reader)
-        if serial == target_serial:
-            return reader
-    return None
+def build_reader_serial_map(readers: list[str]) -> dict[int, str]:
+    """Query each reader once and map its serial number to the reader name.
+
+    Readers whose serial cannot be read (subprocess failure, no YubiKey) are
+    skipped.
+    """
+    return {
+        serial: reader
+        for reader, serial in get_serials_for_readers(readers).items()
+    }
 
 
 def test_bridge() -> bool:
@@ -123,22 +146,20 @@ def test_bridge() -> bool:
     print("Step 3: Map ykman devices to reader names")
     print("-" * 70)
 
+    # One yubico-piv-tool query per reader; the map keys are the serials
+    # reported by the readers themselves, so a hit is already verified.
+    reader_map = build_reader_serial_map(readers)
+
     mapping = {}
     for device, serial, version in ykman_devices:
         print(f"\nLooking for reader corresponding to serial {serial}...")
 
-        reader = find_reader_for_serial(serial, readers)
+        reader = reader_map.get(serial)
 
         if reader:
             print(f"  ✓ Found: {reader}")
+            print("  ✓✓ Verified: reader serial matches ykman serial")
             mapping[serial] = reader
-
-            # Verify by reading serial via reader
-            verified_serial = get_serial_for_reader(reader)
-            if verified_serial == serial:
-                print("  ✓✓ Verified: reader serial matches ykman serial")
-            else:
-                print(f"  ✗ Mismatch: reader reports serial {verified_serial}")
         else:
             print("  ✗ No matching reader found")
 
@@ -170,11 +191,9 @@ def test_bridge() -> bool:
         print("=" * 70)
         print()
 
-        from ykman.device import list_all_devices
-
-        devices = list(list_all_devices())
-        for device, info in devices:
-            print(f"Device serial {info.serial}:")
+        # Reuse the step 1 enumeration instead of scanning USB again
+        for device, serial, _version in ykman_devices:
+            print(f"Device serial {serial}:")
             print(f"  device object: {device}")
             print(f"  device type: {type(device)}")
 
@@ -14,13 +14,29 @@ any state on the YubiKey.
 
 from __future__ import annotations
 
+import functools
 import hashlib
+import io
 import sys
-from typing import Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TextIO
 from collections.abc import Mapping
 
 from fido2.ctap2 import Ctap2
-from fido2.hid import CtapHidDevice
+from fido2.hid import CtapHidDevice, open_device
+
+# Dummy client data hash shared by the get_assertion probes
+CLIENT_DATA_HASH = hashlib.sha256(b"test-touch-detection").digest()
+
+# Dummy 32-byte credential ID that no authenticator will recognize
+DUMMY_CRED_ID = b"x" * 32
+
+# CTAPHID_KEEPALIVE status: the authenticator is waiting for user presence
+_STATUS_UPNEEDED = 2
+
+# CTAP2 error returned when a pending request is cancelled (CTAPHID_CANCEL)
+_ERR_KEEPALIVE_CANCEL = 0x2D
 
 
 def get_yubikey_fido_device(serial: int | None = None) -> CtapHidDevice | None:
@@ -45,159 +61,227 @@ def get_yubikey_fido_device(serial: int | None = None) -> CtapHidDevice | None:
     return devices[0]
 
 
-def test_touch_detection_no_credential(serial: int | None = None) -> None:
+def test_touch_detection_no_credential(
+    serial: int | None = None,
+    device: CtapHidDevice | None = None,
+    out: TextIO = sys.stdout,
+) -> None:
     """
     Test if we can detect touch without requiring credentials.
 
     Strategy: Call get_assertion with a dummy rp_id and empty allow_list.
     Expected: Operation should fail (no credential), but might still wait for touch.
     """
-    print(f"\n{'='*70}")
-    print( "Test 1: get_assertion with empty allow_list")
-    print(f"{'='*70}\n")
+    print(f"\n{'='*70}", file=out)
+    print( "Test 1: get_assertion with empty allow_list", file=out)
+    print(f"{'='*70}\n", file=out)
 
-    device = get_yubikey_fido_device(serial)
     if device is None:
-        print("No FIDO device found")
+        device = get_yubikey_fido_device(serial)
+    if device is None:
+        print("No FIDO device found", file=out)
         return
 
     try:
         ctap2 = Ctap2(device)
 
-        print("Device info:")
-        print(f"  AAGUID: {ctap2.info.aaguid.hex()}")
-        print(f"  Versions: {ctap2.info.versions}")
-        print(f"  Options: {ctap2.info.options}")
-        print()
-
-        # Create a dummy client data hash
-        client_data_hash = hashlib.sha256(b"test-touch-detection").digest()
+        print("Device info:", file=out)
+        print(f"  AAGUID: {ctap2.info.aaguid.hex()}", file=out)
+        print(f"  Versions: {ctap2.info.versions}", file=out)
+        print(f"  Options: {ctap2.info.options}", file=out)
+        print(file=out)
 
         # Try get_assertion with dummy rp_id and empty allow_list
-        print("Attempting get_assertion with empty allow_list...")
-        print("Touch your YubiKey if prompted...")
+        print("Attempting get_assertion with empty allow_list...", file=out)
+        print("Touch your YubiKey if prompted...", file=out)
         try:
             response = ctap2.get_assertion(
                 rp_id="example.com",  # Dummy RP ID
-                client_data_hash=client_data_hash,
+                client_data_hash=CLIENT_DATA_HASH,
                 allow_list=[],  # Empty - no credentials specified
             )
-            print(f"Response received: {response}")
+            print(f"Response received: {response}", file=out)
         except Exception as e:
-            print(f"Error (expected): {type(e).__name__}: {e}")
-            print()
-            print("Analysis: Empty allow_list causes immediate error.")
-            print("Does NOT wait for user touch - unusable for detection.")
+            print(f"Error (expected): {type(e).__name__}: {e}", file=out)
+            print(file=out)
+            print("Analysis: Empty allow_list causes immediate error.", file=out)
+            print("Does NOT wait for user touch - unusable for detection.", file=out)
 
     except Exception as e:
-        print(f"Connection error: {e}")
+        print(f"Connection error: {e}", file=out)
     finally:
         if device:
             device.close()
 
 
-def test_touch_detection_dummy_credential(serial: int | None = None) -> None:
+def test_touch_detection_dummy_credential(
+    serial: int | None = None,
+    device: CtapHidDevice | None = None,
+    cancel: threading.Event | None = None,
+    out: TextIO = sys.stdout,
+) -> None:
     """
     Test if we can detect touch with a non-existent dummy credential.
 
     Strategy: Call get_assertion with a dummy credential ID that doesn't exist.
     Expected: Might wait for touch, then fail with "no credential found".
+
+    When `cancel` is shared between concurrent runs, the first device to
+    answer after waiting for a touch sets it and python-fido2 sends
+    CTAPHID_CANCEL to the others, so they stop waiting for a touch that will
+    not come.  A device that fails immediately does not cancel the others.
     """
-    print(f"\n{'='*70}")
-    print( "Test 2: get_assertion with non-existent credential")
-    print(f"{'='*70}\n")
+    print(f"\n{'='*70}", file=out)
+    print( "Test 2: get_assertion with non-existent credential", file=out)
+    print(f"{'='*70}\n", file=out)
 
-    device = get_yubikey_fido_device(serial)
     if device is None:
-        print("No FIDO device found")
+        device = get_yubikey_fido_device(serial)
+    if device is None:
+        print("No FIDO device found", file=out)
         return
 
     try:
         ctap2 = Ctap2(device)
 
-        # Create a dummy client data hash
-        client_data_hash = hashlib.sha256(b"test-touch-detection").digest()
-
         # Create a dummy credential descriptor
-        dummy_cred_id = b"x" * 32  # Dummy 32-byte credential ID
-
         allow_list: list[Mapping[str, Any]] = [
             {
                 "type": "public-key",
-                "id": dummy_cred_id,
+                "id": DUMMY_CRED_ID,
             }
         ]
 
-        print("Attempting get_assertion with dummy credential...")
-        print("** WATCH YOUR YUBIKEY - Touch it if it starts blinking **")
-        print()
+        print("Attempting get_assertion with dummy credential...", file=out)
+        print("** WATCH YOUR YUBIKEY - Touch it if it starts blinking **", file=out)
+        print(file=out)
 
+        # Set once the key reports it is waiting for a touch
+        waited = False
+
+        def on_keepalive(status: int) -> None:
+            nonlocal waited
+            if status == _STATUS_UPNEEDED:
+                waited = True
+
+        # Only a device that answered after waiting releases the others; a
+        # fast failure leaves their get_assertion running
+        answered = False
         try:
             response = ctap2.get_assertion(
                 rp_id="example.com",  # Dummy RP ID
-                client_data_hash=client_data_hash,
+                client_data_hash=CLIENT_DATA_HASH,
                 allow_list=allow_list,  # Non-existent credential
+                event=cancel,
+                on_keepalive=on_keepalive,
             )
-            print(f"✓ Response received (unexpected): {response}")
+            answered = True
+            print(f"✓ Response received (unexpected): {response}", file=out)
         except Exception as e:
-            print(f"✗ Error (expected): {type(e).__name__}: {e}")
-            print()
-            if "timeout" in str(e).lower() or "keepalive" in str(e).lower():
-                print("Analysis: Operation WAITED for user touch!")
-                print("This means we CAN use FIDO2 for touch detection.")
+            if (
+                cancel is not None
+                and cancel.is_set()
+                and getattr(e, "code", None) == _ERR_KEEPALIVE_CANCEL
+            ):
+                print("Cancelled: another device responded first", file=out)
+                return
+            timed_out = "timeout" in str(e).lower() or "keepalive" in str(e).lower()
+            answered = waited or timed_out
+            print(f"✗ Error (expected): {type(e).__name__}: {e}", file=out)
+            print(file=out)
+            if timed_out:
+                print("Analysis: Operation WAITED for user touch!", file=out)
+                print("This means we CAN use FIDO2 for touch detection.", file=out)
             elif "no credentials" in str(e).lower():
-                print("Analysis: Error indicates no matching credential.")
-                print("Check if operation waited for touch (did LED blink?).")
+                print("Analysis: Error indicates no matching credential.", file=out)
+                print("Check if operation waited for touch (did LED blink?).", file=out)
             else:
-                print("Analysis: Error occurred, check if LED blinked.")
+                print("Analysis: Error occurred, check if LED blinked.", file=out)
+        finally:
+            if cancel is not None and answered:
+                cancel.set()
 
     except Exception as e:
-        print(f"Connection error: {e}")
+        print(f"Connection error: {e}", file=out)
     finally:
         if device:
             device.close()
 
 
-def test_selection_check_no_up(serial: int | None = None) -> None:
+def test_selection_check_no_up(
+    serial: int | None = None,
+    device: CtapHidDevice | None = None,
+    out: TextIO = sys.stdout,
+) -> None:
     """
     Test if we can use FIDO2 selection command without user presence.
 
     Strategy: Try authenticatorSelection command which doesn't require touch.
     This is defined in CTAP 2.1 spec section 6.6.
     """
-    print(f"\n{'='*70}")
-    print( "Test 3: authenticatorSelection (CTAP 2.1)")
-    print(f"{'='*70}\n")
+    print(f"\n{'='*70}", file=out)
+    print( "Test 3: authenticatorSelection (CTAP 2.1)", file=out)
+    print(f"{'='*70}\n", file=out)
 
-    device = get_yubikey_fido_device(serial)
     if device is None:
-        print("No FIDO device found")
+        device = get_yubikey_fido_device(serial)
+    if device is None:
+        print("No FIDO device found", file=out)
         return
 
     try:
-        print("Attempting authenticatorSelection (no UP required)...")
+        print("Attempting authenticatorSelection (no UP required)...", file=out)
 
         try:
             # CTAP 2.1 command 0x0B - authenticatorSelection
             # This is meant to help identify which authenticator to use
             # Should NOT require user presence
             result = device.call(0x0B, b"")
-            print(f"✓ Selection command succeeded: {result}")
-            print()
-            print("Analysis: This command works but doesn't detect touch.")
-            print("It's for device identification, not user presence verification.")
+            print(f"✓ Selection command succeeded: {result}", file=out)
+            print(file=out)
+            print("Analysis: This command works but doesn't detect touch.", file=out)
+            print("It's for device identification, not user presence verification.", file=out)
         except Exception as e:
-            print(f"✗ Error: {type(e).__name__}: {e}")
-            print()
-            print("Analysis: Command not supported or failed.")
+            print(f"✗ Error: {type(e).__name__}: {e}", file=out)
+            print(file=out)
+            print("Analysis: Command not supported or failed.", file=out)
 
     except Exception as e:
-        print(f"Connection error: {e}")
+        print(f"Connection error: {e}", file=out)
     finally:
         if device:
             device.close()
 
 
+def run_on_all_devices(
+    test: Callable[..., None], paths: list[Any]
+) -> None:
+    """Run `test` concurrently on every FIDO device, one thread per device.
+
+    Each worker opens its own handle from the HID path: CTAP transactions
+    are I/O-bound on independent endpoints, and handles must not be shared.
+    Each worker also writes to its own buffer, printed once it is done, so
+    the reports of different devices do not interleave.
+    """
+    def run(path: Any, out: TextIO) -> None:
+        try:
+            device = open_device(path)
+        except Exception as e:
+            # e.g. unplugged since enumeration: report it, keep the others
+            print(f"\nCannot open FIDO device {path!r}: {e}", file=out)
+            return
+        test(device=device, out=out)
+
+    buffers = [io.StringIO() for _ in paths]
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        futures = [
+            executor.submit(run, path, out) for path, out in zip(paths, buffers)
+        ]
+        for future, out in zip(futures, buffers):
+            future.result()
+            sys.stdout.write(out.getvalue())
+
+
 def main() -> int:
     """Main entry point."""
     # Check for FIDO devices
@@ -206,21 +290,36 @@ def main() -> int:
         print("No FIDO devices found.")
         return 1
 
+    # Keep only the HID paths; each test opens fresh per-thread handles
+    paths = [device.descriptor.path for device in fido_devices]
+    for device in fido_devices:
+        device.close()
+
     print(f"\nFound {len(fido_devices)} FIDO device(s)")
     print("\nTesting FIDO2 touch detection")
 
+    # Worker output is buffered until each test ends: prompt here
+    print("Touch your YubiKey if prompted...")
+
     # Test 1: Empty allow_list
-    test_touch_detection_no_credential()
+    run_on_all_devices(test_touch_detection_no_credential, paths)
 
     input("\nPress ENTER to continue to Test 2...")
 
     # Test 2: Non-existent credential
-    test_touch_detection_dummy_credential()
+    # The first device to answer cancels the get_assertion on the others
+    print("\n** WATCH YOUR YUBIKEYS - Touch one if it starts blinking **")
+    run_on_all_devices(
+        functools.partial(
+            test_touch_detection_dummy_credential, cancel=threading.Event()
+        ),
+        paths,
+    )
 
     input("\nPress ENTER to continue to Test 3...")
 
     # Test 3: authenticatorSelection
-    test_selection_check_no_up()
+    run_on_all_devices(test_selection_check_no_up, paths)
 
     print(f"\n{'='*70}")
     print("Testing complete")
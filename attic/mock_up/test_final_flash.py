@@ -8,81 +8,71 @@
 Final test of LED flashing with SELECT PIV command
 """
 
+from __future__ import annotations
+
 import sys
 import time
 import threading
-from typing import Protocol, cast
-
-
-class PcscConnection(Protocol):
-    """Protocol for pyscard connection object."""
-
-    def transmit(self, apdu: list[int]) -> tuple[list[int], int, int]:
-        """Send APDU and receive response."""
-        ...
-
-
-class ScardSmartCardConnection(Protocol):
-    """Protocol for ykman.pcsc.ScardSmartCardConnection."""
-
-    connection: PcscConnection
 
+from _common import SELECT_PIV_APDU, find_device
+from _progress import ProgressWriter
+from yubikit.core.smartcard import SmartCardConnection
 
 def test_flash_with_select_piv(serial: int, duration: int = 10):
     """Test LED flashing using SELECT PIV command."""
-    from ykman.device import list_all_devices
-    from yubikit.core.smartcard import SmartCardConnection
-
     print(f"Testing LED flash for YubiKey {serial}")
     print(f"Using SELECT PIV command (the corrected version)")
     print()
 
-    devices = list_all_devices()
-    device_obj = None
-    for device, info in devices:
-        if info.serial == serial:
-            device_obj = device
-            print(f"Found YubiKey: serial={info.serial}, version={info.version}")
-            break
-
-    if device_obj is None:
+    found = find_device(serial)
+    if found is None:
         print(f"ERROR: YubiKey {serial} not found")
         return
 
+    device_obj, info = found
+    print(f"Found YubiKey: serial={info.serial}, version={info.version}")
+
     print(f"\nFlashing for {duration} seconds...")
     print("*** WATCH THE YUBIKEY LED NOW ***")
     print()
 
-    start_time = time.time()
+    deadline_ns = time.monotonic_ns() + duration * 1_000_000_000
     flash_count = 0
     error_count = 0
 
-    # PIV application AID
-    piv_aid = [0xA0, 0x00, 0x00, 0x03, 0x08]
-
-    while time.time() - start_time < duration:
-        try:
-            with device_obj.open_connection(SmartCardConnection) as _conn:
-                conn = cast(ScardSmartCardConnection, _conn)
-
-                # SELECT PIV application
-                apdu = [0x00, 0xA4, 0x04, 0x00, len(piv_aid)] + piv_aid
-                response, sw1, sw2 = conn.connection.transmit(apdu)
-
-                if sw1 == 0x90 and sw2 == 0x00:
-                    flash_count += 1
-                    print(f"Flash #{flash_count} - LED should be blinking!", end='\r')
-                else:
+    # One connection for the whole test: the SELECT alone flashes the LED,
+    # reconnecting every iteration only adds PC/SC setup cost.
+    try:
+        with device_obj.open_connection(SmartCardConnection) as conn:
+            # Fixed-rate schedule: slow APDUs eat into the wait instead of
+            # adding to it
+            period = 0.05
+            progress = ProgressWriter()
+            next_t = time.monotonic()
+
+            while time.monotonic_ns() < deadline_ns:
+                try:
+                    response, sw = conn.send_and_receive(SELECT_PIV_APDU)
+                except Exception as e:
                     error_count += 1
-                    print(f"\nWarning: Unexpected response SW={sw1:02X}{sw2:02X}")
+                    print(f"\nError: {e}")
+                else:
+                    if sw == 0x9000:
+                        flash_count += 1
+                        progress.update("Flash #%d - LED should be blinking!", flash_count)
+                    else:
+                        error_count += 1
+                        print(f"\nWarning: Unexpected response SW={sw:04X}")
 
                 # Wait before next flash
-                time.sleep(0.3)
+                next_t += period
+                delay = next_t - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
 
-        except Exception as e:
-            error_count += 1
-            print(f"\nError: {e}")
-            time.sleep(0.1)
+    except Exception as e:
+        error_count += 1
+        print(f"\nConnection error: {e}")
 
     print(f"\n\n{'='*60}")
     print(f"Test complete!")
@@ -94,10 +84,17 @@ def test_flash_with_select_piv(serial: int, duration: int = 10):
     print("(Each connection should cause a brief LED activity)")
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
+def main(argv: list[str] | None = None) -> int:
+    """Entry point; `argv` defaults to the command-line arguments."""
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
         print("Usage: python test_final_flash.py <serial_number>")
-        sys.exit(1)
+        return 1
 
-    serial = int(sys.argv[1])
+    serial = int(args[0])
     test_flash_with_select_piv(serial, duration=10)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
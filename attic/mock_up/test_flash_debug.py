@@ -8,88 +8,84 @@
 Debug version - shows all errors instead of catching them
 """
 
+from __future__ import annotations
+
 import sys
 import time
 import threading
-from typing import Protocol, cast
-
-
-class PcscConnection(Protocol):
-    """Protocol for pyscard connection object."""
-
-    def transmit(self, apdu: list[int]) -> tuple[list[int], int, int]:
-        """Send APDU and receive response."""
-        ...
-
-
-class ScardSmartCardConnection(Protocol):
-    """Protocol for ykman.pcsc.ScardSmartCardConnection."""
-
-    connection: PcscConnection
 
+from _common import SELECT_PIV_APDU, find_device
+from yubikit.core.smartcard import SmartCardConnection
 
 def flash_yubikey_debug(serial: int, duration: int = 10):
     """Flash with full error reporting."""
-    from ykman.device import list_all_devices
-    from yubikit.core.smartcard import SmartCardConnection
-
     print(f"Looking for YubiKey {serial}...")
-    devices = list_all_devices()
-    device_obj = None
-    for device, info in devices:
-        print(f"  Found: serial={info.serial}, version={info.version}")
-        if info.serial == serial:
-            device_obj = device
-            print(f"  ✓ Matched!")
-            break
-
-    if device_obj is None:
+    found = find_device(serial)
+    if found is None:
         print(f"ERROR: Device {serial} not found")
         return
 
+    device_obj, info = found
+    print(f"  Found: serial={info.serial}, version={info.version}")
+    print(f"  ✓ Matched!")
+
     print(f"\nStarting flash loop for {duration} seconds...")
     print("WATCH THE YUBIKEY!")
     print()
 
-    start_time = time.time()
+    deadline_ns = time.monotonic_ns() + duration * 1_000_000_000
     flash_count = 0
     error_count = 0
 
-    while time.time() - start_time < duration:
-        try:
-            with device_obj.open_connection(SmartCardConnection) as _conn:
-                conn = cast(ScardSmartCardConnection, _conn)
-                print(f"Connection opened, type={type(_conn)}")
+    # Try SELECT PIV application instead
+    apdu = SELECT_PIV_APDU
+    apdu_hex = ' '.join(f'{b:02X}' for b in apdu)
+
+    # One connection for the whole loop; only the transmit is repeated
+    with device_obj.open_connection(SmartCardConnection) as conn:
+        print(f"Connection opened, type={type(conn)}")
 
-                # Try SELECT PIV application instead
-                # PIV AID: A0 00 00 03 08
-                piv_aid = [0xA0, 0x00, 0x00, 0x03, 0x08]
-                apdu = [0x00, 0xA4, 0x04, 0x00, len(piv_aid)] + piv_aid
-                print(f"Sending SELECT PIV: {' '.join(f'{b:02X}' for b in apdu)}")
+        # Fixed-rate schedule: slow APDUs eat into the wait
+        period = 0.05
+        next_t = time.monotonic()
 
-                response, sw1, sw2 = conn.connection.transmit(apdu)
+        while time.monotonic_ns() < deadline_ns:
+            try:
+                print(f"Sending SELECT PIV: {apdu_hex}")
 
-                print(f"Response: SW={sw1:02X}{sw2:02X}, data_len={len(response)}")
+                response, sw = conn.send_and_receive(apdu)
+
+                print(f"Response: SW={sw:04X}, data_len={len(response)}")
 
                 flash_count += 1
 
-        except Exception as e:
-            error_count += 1
-            print(f"ERROR #{error_count}: {type(e).__name__}: {e}")
-            import traceback
-            traceback.print_exc()
+            except Exception as e:
+                error_count += 1
+                print(f"ERROR #{error_count}: {type(e).__name__}: {e}")
+                import traceback
+                traceback.print_exc()
 
-        time.sleep(0.5)
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
 
     print(f"\n\nSummary:")
     print(f"  Successful flashes: {flash_count}")
     print(f"  Errors: {error_count}")
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
+def main(argv: list[str] | None = None) -> int:
+    """Entry point; `argv` defaults to the command-line arguments."""
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
         print("Usage: python test_flash_debug.py <serial_number>")
-        sys.exit(1)
+        return 1
 
-    serial = int(sys.argv[1])
+    serial = int(args[0])
     flash_yubikey_debug(serial, duration=5)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
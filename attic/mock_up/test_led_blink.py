@@ -14,40 +14,20 @@ from __future__ import annotations
 
 import sys
 import time
-from typing import Protocol, Tuple, cast
+from typing import Any
 
+from _common import GET_VERSION_APDU
+from _device_cache import list_all_devices_cached
+from _progress import ProgressWriter
+from yubikit.core.smartcard import SmartCardConnection
+from yubikit.piv import OBJECT_ID, PivSession
 
-class PcscConnection(Protocol):
-    """Protocol for pyscard connection object (accessed via conn.connection)."""
-    def transmit(self, apdu: list[int]) -> Tuple[list[int], int, int]:
-        """Send APDU and receive response."""
-        ...
-
-
-class ScardSmartCardConnection(Protocol):
-    """Protocol for ykman.pcsc.ScardSmartCardConnection."""
-    connection: PcscConnection
-
-    def send_and_receive(self, apdu: bytes) -> Tuple[bytes, int]:
-        """Send APDU and receive response (yubikit API)."""
-        ...
-
-
-def blink_test_via_config_read() -> bool:
+def blink_test_via_config_read(device: Any, info: Any) -> bool:
     """Read config repeatedly to trigger LED blinking."""
-    from ykman.device import list_all_devices
-    from yubikit.core.smartcard import SmartCardConnection
-
     print("=" * 70)
     print("YubiKey LED Blinking Test - Configuration Reads")
     print("=" * 70)
 
-    devices = list(list_all_devices())
-    if not devices:
-        print("✗ No YubiKeys found")
-        return False
-
-    device, info = devices[0]
     print(f"\nUsing YubiKey serial: {info.serial}")
     print()
     print("=" * 70)
@@ -62,18 +42,23 @@ def blink_test_via_config_read() -> bool:
         print("(Each read should cause a brief LED flash)")
         print()
 
+        # Fixed-rate schedule: read time eats into the 0.2 s period
+        period = 0.2
+        progress = ProgressWriter()
+        next_t = time.monotonic()
         for i in range(10):
-            with device.open_connection(SmartCardConnection) as _conn:
-                conn = cast(ScardSmartCardConnection, _conn)
+            with device.open_connection(SmartCardConnection) as conn:
                 # Read version and serial - these are quick ops that trigger LED
-                # GET VERSION
-                apdu = [0x00, 0xF7, 0x00, 0x00]
-                response, sw1, sw2 = conn.connection.transmit(apdu)
+                response, sw = conn.send_and_receive(GET_VERSION_APDU)
 
                 if i % 2 == 0:
-                    print(f"  Read {i+1}/10 - LED should have flashed", end='\r')
+                    progress.update("  Read %d/10 - LED should have flashed", i + 1)
 
-            time.sleep(0.2)  # Small delay between reads
+            # Small delay between reads
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
 
         print()
         print()
@@ -89,22 +74,12 @@ def blink_test_via_config_read() -> bool:
         return False
 
 
-def blink_test_via_piv_operations() -> bool:
+def blink_test_via_piv_operations(device: Any, info: Any) -> bool:
     """Multiple PIV operations to trigger LED."""
-    from ykman.device import list_all_devices
-    from yubikit.core.smartcard import SmartCardConnection
-    from yubikit.piv import PivSession
-
     print("=" * 70)
     print("YubiKey LED Blinking Test - PIV Operations")
     print("=" * 70)
 
-    devices = list(list_all_devices())
-    if not devices:
-        print("✗ No YubiKeys found")
-        return False
-
-    device, info = devices[0]
     print(f"\nUsing YubiKey serial: {info.serial}")
     print()
     print("=" * 70)
@@ -115,27 +90,36 @@ def blink_test_via_piv_operations() -> bool:
 
     try:
         print("Performing 10 PIV session operations...")
-        print("(Each session creation + read should cause LED activity)")
+        print("(Each read should cause LED activity)")
         print()
 
-        for i in range(10):
-            with device.open_connection(SmartCardConnection) as conn:
-                piv = PivSession(conn)
+        # One connection and PIV session for all probes: session bring-up
+        # (SELECT + version) is done once, not per iteration.
+        with device.open_connection(SmartCardConnection) as conn:
+            piv = PivSession(conn)
 
+            # Fixed-rate schedule: probe time eats into the 0.15 s period
+            period = 0.15
+            progress = ProgressWriter()
+            next_t = time.monotonic()
+            for i in range(10):
                 # Read PIN attempts (quick operation)
                 piv.get_pin_attempts()
 
                 # Try to read discovery object
-                from yubikit.piv import OBJECT_ID
                 try:
                     piv.get_object(OBJECT_ID.DISCOVERY)
                 except Exception:
                     pass
 
                 if i % 2 == 0:
-                    print(f"  Operation {i+1}/10 - LED should be active", end='\r')
+                    progress.update("  Operation %d/10 - LED should be active", i + 1)
 
-            time.sleep(0.15)  # Small delay
+                # Small delay
+                next_t += period
+                delay = next_t - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
 
         print()
         print()
@@ -169,15 +153,23 @@ def main() -> int:
     print()
 
     try:
+        # Enumerate once; both tests use the same device
+        devices = list_all_devices_cached()
+        if not devices:
+            print("✗ No YubiKeys found")
+            return 1
+
+        device, info = devices[0]
+
         # Test 1: Config reads
-        result1 = blink_test_via_config_read()
+        result1 = blink_test_via_config_read(device, info)
 
         print()
         input("Press ENTER for the second test...")
         print()
 
         # Test 2: PIV operations
-        result2 = blink_test_via_piv_operations()
+        result2 = blink_test_via_piv_operations(device, info)
 
         print()
         print("=" * 70)
@@ -8,25 +8,15 @@
 Simple test to verify LED flashing on YubiKey.
 """
 
+from __future__ import annotations
+
 import sys
 import time
 import threading
-from typing import Protocol, cast
-
-
-class PcscConnection(Protocol):
-    """Protocol for pyscard connection object."""
-
-    def transmit(self, apdu: list[int]) -> tuple[list[int], int, int]:
-        """Send APDU and receive response."""
-        ...
-
-
-class ScardSmartCardConnection(Protocol):
-    """Protocol for ykman.pcsc.ScardSmartCardConnection."""
-
-    connection: PcscConnection
 
+from _common import GET_VERSION_APDU, find_device
+from _progress import ProgressWriter
+from yubikit.core.smartcard import SmartCardConnection
 
 def test_led_flash(serial: int, duration: int = 10):
     """
@@ -36,45 +26,43 @@ def test_led_flash(serial: int, duration: int = 10):
         serial: YubiKey serial number
         duration: How long to flash in seconds
     """
-    from ykman.device import list_all_devices
-    from yubikit.core.smartcard import SmartCardConnection
-
     print(f"Looking for YubiKey with serial {serial}...")
 
-    devices = list_all_devices()
-    device_obj = None
-    for device, info in devices:
-        print(f"Found device: serial={info.serial}, version={info.version}")
-        if info.serial == serial:
-            device_obj = device
-            print(f"✓ Matched target serial {serial}")
-            break
-
-    if device_obj is None:
+    found = find_device(serial)
+    if found is None:
         print(f"✗ Device {serial} not found")
         return False
 
+    device_obj, info = found
+    print(f"Found device: serial={info.serial}, version={info.version}")
+    print(f"✓ Matched target serial {serial}")
+
     print(f"\nFlashing LED for {duration} seconds...")
     print("WATCH THE YUBIKEY NOW!")
     print()
 
-    start_time = time.time()
+    deadline_ns = time.monotonic_ns() + duration * 1_000_000_000
     flash_count = 0
 
-    # PIV application AID: A0 00 00 03 08
-    piv_aid = [0xA0, 0x00, 0x00, 0x03, 0x08]
-
     # Test 1: Just opening connection (might cause LED flash by itself)
     print("Test 1: Opening/closing connection repeatedly...")
+    # Fixed-rate schedule: connection time eats into the wait.  Ten
+    # iterations at 0.3 s keep the test long enough to watch.
+    period = 0.3
+    progress = ProgressWriter()
+    next_t = time.monotonic()
     for i in range(10):
         try:
             with device_obj.open_connection(SmartCardConnection) as _conn:
                 pass  # Just open and close
             flash_count += 1
-            print(f"Open/close #{flash_count}", end='\r')
-            time.sleep(0.3)
+            progress.update("Open/close #%d", flash_count)
         except Exception as e:
             print(f"\nError: {e}")
+        next_t += period
+        delay = next_t - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
 
     print(f"\n\nTest 1 complete. Did you see LED flashing? (y/n): ", end='')
 
@@ -82,33 +70,46 @@ def test_led_flash(serial: int, duration: int = 10):
     print("\n\nTest 2: Sending APDU commands...")
     flash_count = 0
 
-    while time.time() - start_time < duration:
-        try:
-            with device_obj.open_connection(SmartCardConnection) as _conn:
-                conn = cast(ScardSmartCardConnection, _conn)
+    # Unlike test 1, keep a single connection open and repeat only the APDU
+    try:
+        with device_obj.open_connection(SmartCardConnection) as conn:
 
-                # Try just GET VERSION without selecting PIV
-                get_version = [0x00, 0xF7, 0x00, 0x00]
+            period = 0.05
+            progress = ProgressWriter()
+            next_t = time.monotonic()
+
+            while time.monotonic_ns() < deadline_ns:
                 try:
-                    response, sw1, sw2 = conn.connection.transmit(get_version)
+                    # Just GET VERSION, without selecting PIV
+                    response, sw = conn.send_and_receive(GET_VERSION_APDU)
                     flash_count += 1
-                    print(f"Flash #{flash_count}: SW={sw1:02X}{sw2:02X}", end='\r')
+                    progress.update("Flash #%d: SW=%04X", flash_count, sw)
                 except Exception as apdu_err:
                     print(f"\nAPDU error: {apdu_err}")
 
-                time.sleep(0.3)
-        except Exception as e:
-            print(f"\nConnection error: {e}")
-            time.sleep(0.1)
+                next_t += period
+                delay = next_t - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+    except Exception as e:
+        print(f"\nConnection error: {e}")
 
     print(f"\n\nTotal flashes: {flash_count}")
     print("Did you see the LED flashing? (it should blink green)")
     return True
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point; `argv` defaults to the command-line arguments."""
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
         print("Usage: python test_led_flash.py <serial_number>")
-        sys.exit(1)
+        return 1
 
-    serial = int(sys.argv[1])
+    serial = int(args[0])
     test_led_flash(serial, duration=10)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,12 +8,19 @@
 Test the actual flash function from yubikey_selector.py
 """
 
+import asyncio
+import os
 import sys
 import time
 import threading
 from typing import Protocol, cast
 
 
+# GET VERSION command - quick and causes LED flash.  pyscard's transmit()
+# takes a list of ints, so one shared list is built at import time.
+_APDU_GET_VERSION: list[int] = [0x00, 0xF7, 0x00, 0x00]
+
+
 class PcscConnection(Protocol):
     """Protocol for pyscard connection object."""
 
@@ -28,18 +35,30 @@ class ScardSmartCardConnection(Protocol):
     connection: PcscConnection
 
 
-def flash_yubikey_continuously(serial: int, stop_event: threading.Event) -> None:
+async def flash_yubikey_async(serial: int, stop_event: asyncio.Event) -> None:
     """
     Flash the LED of the YubiKey with the given serial number continuously.
     This is copied directly from yubikey_selector.py.
 
-    Continues flashing until stop_event is set.
+    Continues flashing until stop_event is set.  The blocking PC/SC calls run
+    in the loop's default executor, so the flashing shares the event loop of
+    the interactive UI instead of needing its own thread.
     """
+    loop = asyncio.get_running_loop()
+
+    async def stopped(timeout: float) -> bool:
+        """Wait up to `timeout` seconds; True as soon as stop_event is set."""
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
     try:
         from ykman.device import list_all_devices
         from yubikit.core.smartcard import SmartCardConnection
 
-        devices = list_all_devices()
+        devices = await loop.run_in_executor(None, list_all_devices)
         device_obj = None
         for device, info in devices:
             if info.serial == serial:
@@ -49,29 +68,67 @@ def flash_yubikey_continuously(serial: int, stop_event: threading.Event) -> None
         if device_obj is None:
             return
 
-        # Flash continuously until stopped
+        # Flash continuously until stopped, over one long-lived connection;
+        # the outer loop only reopens it if the connection is lost
         while not stop_event.is_set():
             try:
-                with device_obj.open_connection(SmartCardConnection) as _conn:
-                    conn = cast(ScardSmartCardConnection, _conn)
-                    # GET VERSION command - quick and causes LED flash
-                    apdu = [0x00, 0xF7, 0x00, 0x00]
-                    conn.connection.transmit(apdu)
-
-                # Wait a bit before next flash (avoid excessive polling)
-                # Check stop_event more frequently for responsiveness
-                for _ in range(3):  # 3 x 100ms = 300ms between flashes
-                    if stop_event.is_set():
-                        break
-                    time.sleep(0.1)
+                _conn = await loop.run_in_executor(
+                    None, device_obj.open_connection, SmartCardConnection
+                )
+                conn = cast(ScardSmartCardConnection, _conn)
+                transmit: asyncio.Future[object] | None = None
+                try:
+                    while True:
+                        transmit = loop.run_in_executor(
+                            None, conn.connection.transmit, _APDU_GET_VERSION
+                        )
+                        # Shielded: a cancel (e.g. the app exiting) must not
+                        # leave the transmit running on a handle we close
+                        await asyncio.shield(transmit)
+
+                        # Wait a bit before next flash (avoid excessive polling);
+                        # returns as soon as stop_event is set
+                        if await stopped(0.3):
+                            break
+                finally:
+                    if transmit is not None:
+                        await asyncio.wait([transmit])
+                    _conn.close()
             except Exception:
                 # Ignore errors and continue flashing
-                if not stop_event.is_set():
-                    time.sleep(0.1)
+                if await stopped(0.1):
+                    break
     except Exception:
         # Silently ignore errors during flashing
         pass
 
+
+def flash_yubikey_continuously(serial: int, stop_fd: int) -> None:
+    """Blocking wrapper around flash_yubikey_async() for thread-based callers.
+
+    `stop_fd` is the read end of a pipe: writing a byte to the other end stops
+    the flashing.  The loop's selector watches it directly, so the wakeup is
+    immediate and needs no relay thread.
+    """
+
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        done = asyncio.Event()
+
+        def on_stop() -> None:
+            # The selector is level-triggered: unregister before the loop
+            # polls again, or the unread byte keeps firing this callback.
+            loop.remove_reader(stop_fd)
+            done.set()
+
+        loop.add_reader(stop_fd, on_stop)
+        try:
+            await flash_yubikey_async(serial, done)
+        finally:
+            loop.remove_reader(stop_fd)
+
+    asyncio.run(run())
+
 if __name__ == "__main__":
     if len(sys.argv) != 2:
         print("Usage: python test_selector_flash.py <serial_number>")
@@ -86,10 +143,10 @@ if __name__ == "__main__":
     print("WATCH THE YUBIKEY NOW!")
     print()
 
-    stop_event = threading.Event()
+    stop_r, stop_w = os.pipe()
     flash_thread = threading.Thread(
         target=flash_yubikey_continuously,
-        args=(serial, stop_event),
+        args=(serial, stop_r),
         daemon=True
     )
     flash_thread.start()
@@ -98,7 +155,14 @@ if __name__ == "__main__":
     time.sleep(10)
 
     # Stop flashing
-    stop_event.set()
-    flash_thread.join(timeout=1)
+    os.write(stop_w, b"x")
+    # The flasher wakes on the pipe at once; only a transmit stuck in
+    # PC/SC could keep it alive past this
+    flash_thread.join(timeout=0.5)
+    if flash_thread.is_alive():
+        print("Warning: flash thread still busy (PC/SC call did not return)")
+    else:
+        os.close(stop_r)
+    os.close(stop_w)
 
     print("\n\nDid you see the LED flashing? (it should blink green)")
@@ -11,13 +11,77 @@ Tests:
 1. Device selection via ykman API
 2. PIV application access using ykman-selected device
 3. YubiKey LED blinking (physical feedback)
+
+Set YB_SLOW_LED=1 to space out the LED probes for visual inspection.
 """
 
 from __future__ import annotations
 
+import os
 import sys
 import time
-from typing import Protocol, Tuple, cast
+from typing import Any, Protocol, Tuple, cast
+
+from ykman.device import list_all_devices
+from yubikit.core.smartcard import SmartCardConnection
+from yubikit.piv import OBJECT_ID, SLOT, PivSession
+
+from _common import SELECT_PIV_APDU
+
+
+# YubiKey-specific APDUs, built once (pyscard's transmit() takes a list of ints)
+_APDU_GET_VERSION: list[int] = [0x00, 0xF7, 0x00, 0x00]
+_APDU_GET_SERIAL: list[int] = [0x00, 0xF8, 0x00, 0x00]
+
+# PIV VERIFY (PIN, key reference 80): a deliberately wrong PIN "00000000",
+# and the empty form, which only reports the retry counter (SW 63Cx)
+_APDU_VERIFY_WRONG_PIN = bytes([0x00, 0x20, 0x00, 0x80, 0x08]) + b"00000000"
+_APDU_VERIFY_STATUS = bytes([0x00, 0x20, 0x00, 0x80])
+
+# Standard PIV objects read in quick succession by test 2
+_PIV_OBJECTS = (OBJECT_ID.CHUID, OBJECT_ID.CAPABILITY, OBJECT_ID.DISCOVERY)
+
+# Key slots whose touch policy test 3 inspects
+_PIV_SLOTS = (
+    SLOT.AUTHENTICATION,    # 9a
+    SLOT.SIGNATURE,         # 9c
+    SLOT.KEY_MANAGEMENT,    # 9d
+    SLOT.CARD_AUTH,         # 9e
+)
+
+# Pauses between probes only help a human watching the LED
+_SLOW_LED = bool(os.environ.get("YB_SLOW_LED"))
+
+_BAR70 = "=" * 70
+_BANNER = (
+    "\n\n"
+    "╔" + "═" * 68 + "╗\n"
+    "║" + " " * 68 + "║\n"
+    "║" + "ykman API End-to-End Connectivity Verification".center(68) + "║\n"
+    "║" + " " * 68 + "║\n"
+    "╚" + "═" * 68 + "╝\n"
+    "\n"
+)
+
+
+class _Buffered:
+    """Collect output lines and write them to stdout in one call on flush()."""
+
+    def __init__(self) -> None:
+        self._lines: list[str] = []
+
+    def __call__(self, line: str = "") -> None:
+        self._lines.append(line)
+
+    def flush(self) -> None:
+        if self._lines:
+            sys.stdout.write("\n".join(self._lines) + "\n")
+            sys.stdout.flush()
+            self._lines.clear()
+
+
+# Test output goes through log(); main() flushes it after each test
+log = _Buffered()
 
 
 class PcscConnection(Protocol):
@@ -36,276 +100,226 @@ class ScardSmartCardConnection(Protocol):
         ...
 
 
-def test_1_device_selection() -> bool:
+def test_1_device_selection(conn: Any, info: Any) -> bool:
     """Test 1: Select device via ykman and get PIV info."""
-    from ykman.device import list_all_devices
-    from yubikit.core.smartcard import SmartCardConnection
-    from yubikit.piv import PivSession
-
-    print("=" * 70)
-    print("TEST 1: Device Selection and PIV Access via ykman")
-    print("=" * 70)
+    log(_BAR70)
+    log("TEST 1: Device Selection and PIV Access via ykman")
+    log(_BAR70)
 
-    # List devices
-    devices = list(list_all_devices())
-
-    if not devices:
-        print("✗ No YubiKeys found")
-        return False
-
-    device, info = devices[0]
-
-    print("\n✓ Found YubiKey via ykman API:")
-    print(f"  Serial: {info.serial}")
-    print(f"  Version: {info.version}")
-    print()
+    log("\n✓ Found YubiKey via ykman API:")
+    log(f"  Serial: {info.serial}")
+    log(f"  Version: {info.version}")
+    log()
 
     # Open PIV connection
-    print("Opening PIV session...")
+    log("Opening PIV session...")
     try:
-        with device.open_connection(SmartCardConnection) as conn:
-            piv = PivSession(conn)
-
-            print( "✓ PIV session established:")
-            print(f"  PIV version: {piv.version}")
-            print(f"  PIN attempts remaining: {piv.get_pin_attempts()}")
-
-            # Try to read a standard PIV object (CHUID - Card Holder Unique ID)
-            from yubikit.piv import OBJECT_ID
-            try:
-                chuid = piv.get_object(OBJECT_ID.CHUID)
-                if chuid:
-                    print(f"  ✓ Read CHUID object: {len(chuid)} bytes")
-                else:
-                    print( "  ℹ CHUID object is empty (normal for new YubiKey)")
-            except Exception as e:
-                print(f"  ℹ Could not read CHUID: {e}")
-
-            print()
-            print("✓✓ CONFIRMED: Can access PIV application via ykman-selected device")
-            return True
+        piv = PivSession(conn)
+
+        log( "✓ PIV session established:")
+        log(f"  PIV version: {piv.version}")
+        log(f"  PIN attempts remaining: {piv.get_pin_attempts()}")
+
+        # Try to read a standard PIV object (CHUID - Card Holder Unique ID)
+        try:
+            chuid = piv.get_object(OBJECT_ID.CHUID)
+            if chuid:
+                log(f"  ✓ Read CHUID object: {len(chuid)} bytes")
+            else:
+                log( "  ℹ CHUID object is empty (normal for new YubiKey)")
+        except Exception as e:
+            log(f"  ℹ Could not read CHUID: {e}")
+
+        log()
+        log("✓✓ CONFIRMED: Can access PIV application via ykman-selected device")
+        return True
 
     except Exception as e:
-        print(f"✗ Failed to access PIV: {e}")
+        log(f"✗ Failed to access PIV: {e}")
         import traceback
+        log.flush()
         traceback.print_exc()
         return False
 
 
-def test_2_blink_yubikey() -> bool:
+def test_2_blink_yubikey(conn: Any, info: Any) -> bool:
     """Test 2: Make YubiKey LED blink."""
-    from ykman.device import list_all_devices
-    from yubikit.core.smartcard import SmartCardConnection
-    from yubikit.piv import PivSession
+    log(_BAR70)
+    log("TEST 2: YubiKey LED Blinking")
+    log(_BAR70)
 
-    print("=" * 70)
-    print("TEST 2: YubiKey LED Blinking")
-    print("=" * 70)
-
-    devices = list(list_all_devices())
-    if not devices:
-        print("✗ No YubiKeys found")
-        return False
-
-    device, info = devices[0]
-    print(f"\nTesting with YubiKey {info.serial}...")
-    print()
+    log(f"\nTesting with YubiKey {info.serial}...")
+    log()
 
     # Method 1: Try to trigger LED via verify PIN (with empty PIN)
-    print("Method 1: Triggering LED via PIN verification...")
-    print("(Note: This will FAIL with wrong PIN, but should cause LED activity)")
-    print()
+    log("Method 1: Triggering LED via PIN verification...")
+    log("(Note: This will FAIL with wrong PIN, but should cause LED activity)")
+    log()
 
     try:
-        with device.open_connection(SmartCardConnection) as conn:
-            piv = PivSession(conn)
-
-            # Send VERIFY command with empty PIN (will fail but may trigger LED)
-            # APDU: 00 20 00 80 <len> <pin>
-            # Using a clearly wrong PIN to avoid accidentally using real PIN
-
-            print("Sending PIN verification command (will intentionally fail)...")
-            print("** WATCH THE YUBIKEY LED NOW **")
-            print()
-
-            # Try the verify operation (will fail but may blink)
-            try:
-                piv.verify_pin("00000000")  # Wrong PIN, will fail
-            except Exception as e:
-                print(f"  Expected failure: {type(e).__name__}")
-
-            time.sleep(0.5)
-
-            pin_attempts = piv.get_pin_attempts()
-            print(f"  PIN attempts remaining: {pin_attempts}")
-            print()
+        # Raw APDUs rather than PivSession: a bare SELECT is all VERIFY
+        # needs, without the version/metadata reads PivSession adds
+        conn.send_and_receive(SELECT_PIV_APDU)
+
+        # Send VERIFY command with wrong PIN (will fail but may trigger LED)
+        # APDU: 00 20 00 80 <len> <pin>
+        # Using a clearly wrong PIN to avoid accidentally using real PIN
+
+        log("Sending PIN verification command (will intentionally fail)...")
+        log("** WATCH THE YUBIKEY LED NOW **")
+        log()
+        log.flush()  # show the cue before the probe runs
+
+        # Try the verify operation (will fail but may blink)
+        _, sw = conn.send_and_receive(_APDU_VERIFY_WRONG_PIN)
+        log(f"  Expected failure: SW={sw:04X}")
+
+        time.sleep(0.5)
+
+        _, sw = conn.send_and_receive(_APDU_VERIFY_STATUS)
+        if sw & 0xFFF0 == 0x63C0:
+            pin_attempts = sw & 0x0F
+        elif sw == 0x6983:  # PIN blocked
+            pin_attempts = 0
+        else:
+            pin_attempts = f"unknown (SW={sw:04X})"
+        log(f"  PIN attempts remaining: {pin_attempts}")
+        log()
 
     except Exception as e:
-        print(f"Error: {e}")
+        log(f"Error: {e}")
 
     # Method 2: Read multiple objects rapidly (may cause LED activity)
-    print("Method 2: Rapid PIV object access...")
-    print("** WATCH THE YUBIKEY LED NOW **")
-    print()
+    log("Method 2: Rapid PIV object access...")
+    log("** WATCH THE YUBIKEY LED NOW **")
+    log()
+    log.flush()  # show the cue before the probe runs
 
     try:
-        with device.open_connection(SmartCardConnection) as conn:
-            piv = PivSession(conn)
-
-            # Read several objects in quick succession
-            from yubikit.piv import OBJECT_ID
-
-            objects_to_read = [
-                OBJECT_ID.CHUID,
-                OBJECT_ID.CAPABILITY,
-                OBJECT_ID.DISCOVERY,
-            ]
-
-            for obj_id in objects_to_read:
-                try:
-                    data = piv.get_object(obj_id)
-                    status = f"{len(data)} bytes" if data else "empty"
-                    print(f"  Read {obj_id.name}: {status}")
+        piv = PivSession(conn)
+
+        # Read several objects in quick succession
+        for obj_id in _PIV_OBJECTS:
+            try:
+                data = piv.get_object(obj_id)
+                status = f"{len(data)} bytes" if data else "empty"
+                log(f"  Read {obj_id.name}: {status}")
+                if _SLOW_LED:
                     time.sleep(0.1)  # Small delay between reads
-                except Exception as e:
-                    print(f"  Read {obj_id.name}: {e}")
+            except Exception as e:
+                log(f"  Read {obj_id.name}: {e}")
 
-            print()
+        log()
 
     except Exception as e:
-        print(f"Error: {e}")
+        log(f"Error: {e}")
 
-    print("If you saw LED activity, we have physical confirmation!")
-    print()
+    log("If you saw LED activity, we have physical confirmation!")
+    log()
 
     return True
 
 
-def test_3_touch_required_operation() -> bool:
+def test_3_touch_required_operation(conn: Any, info: Any) -> bool:
     """Test 3: Operation that requires touch (definite LED activity)."""
-    from ykman.device import list_all_devices
-    from yubikit.core.smartcard import SmartCardConnection
-    from yubikit.piv import SLOT, PivSession
+    log(_BAR70)
+    log("TEST 3: Check for Touch-Required Slots (Definite LED Activity)")
+    log(_BAR70)
 
-    print("=" * 70)
-    print("TEST 3: Check for Touch-Required Slots (Definite LED Activity)")
-    print("=" * 70)
-
-    devices = list(list_all_devices())
-    if not devices:
-        print("✗ No YubiKeys found")
-        return False
-
-    device, info = devices[0]
-    print(f"\nChecking YubiKey {info.serial} for touch-required slots...")
-    print()
+    log(f"\nChecking YubiKey {info.serial} for touch-required slots...")
+    log()
 
     try:
-        with device.open_connection(SmartCardConnection) as conn:
-            piv = PivSession(conn)
-
-            # Check if any slots have touch policy set
-            # We'll try to get metadata for key slots
-            from yubikit.piv import SLOT
-
-            slots_to_check = [
-                SLOT.AUTHENTICATION,    # 9a
-                SLOT.SIGNATURE,         # 9c
-                SLOT.KEY_MANAGEMENT,    # 9d
-                SLOT.CARD_AUTH,         # 9e
-            ]
-
-            print("Checking slot metadata:")
-            for slot in slots_to_check:
-                try:
-                    # Try to get certificate (doesn't require touch)
-                    cert = piv.get_certificate(slot)
-                    if cert:
-                        print(f"  Slot {slot.name}: Has certificate")
-
-                        # Try to get slot metadata if available
-                        try:
-                            metadata = piv.get_slot_metadata(slot)
-                            print(f"    Touch policy: {metadata.touch_policy}")
-                            if str(metadata.touch_policy) != 'NEVER':
-                                print( "    ** This slot requires touch - LED will blink during use! **")
-                        except Exception:
-                            print( "    Metadata not available")
-                    else:
-                        print(f"  Slot {slot.name}: Empty")
-                except Exception as e:
-                    print(f"  Slot {slot.name}: {e}")
+        piv = PivSession(conn)
 
-            print()
+        # Check if any slots have touch policy set
+        # We'll try to get metadata for key slots
+        log("Checking slot metadata:")
+        for slot in _PIV_SLOTS:
+            try:
+                # Try to get certificate (doesn't require touch)
+                cert = piv.get_certificate(slot)
+                if cert:
+                    log(f"  Slot {slot.name}: Has certificate")
+
+                    # Try to get slot metadata if available
+                    try:
+                        metadata = piv.get_slot_metadata(slot)
+                        log(f"    Touch policy: {metadata.touch_policy}")
+                        if str(metadata.touch_policy) != 'NEVER':
+                            log( "    ** This slot requires touch - LED will blink during use! **")
+                    except Exception:
+                        log( "    Metadata not available")
+                else:
+                    log(f"  Slot {slot.name}: Empty")
+            except Exception as e:
+                log(f"  Slot {slot.name}: {e}")
+
+        log()
 
     except Exception as e:
-        print(f"Error: {e}")
+        log(f"Error: {e}")
         import traceback
+        log.flush()
         traceback.print_exc()
 
     return True
 
 
-def test_4_raw_apdu_blink() -> bool:
+def test_4_raw_apdu_blink(conn: Any, info: Any) -> bool:
     """Test 4: Send specific APDU that might trigger LED."""
-    from ykman.device import list_all_devices
-    from yubikit.core.smartcard import SmartCardConnection
-    #from yubikit.piv import PivSession
+    log(_BAR70)
+    log("TEST 4: Trigger LED via YubiKey-Specific Commands")
+    log(_BAR70)
 
-    print("=" * 70)
-    print("TEST 4: Trigger LED via YubiKey-Specific Commands")
-    print("=" * 70)
-
-    devices = list(list_all_devices())
-    if not devices:
-        print("✗ No YubiKeys found")
-        return False
-
-    device, info = devices[0]
-    print(f"\nTesting with YubiKey {info.serial}...")
-    print()
+    log(f"\nTesting with YubiKey {info.serial}...")
+    log()
 
     # YubiKey has a SET LED command in some modes
     # Also, generating a key might trigger LED activity
 
-    print("Method: Read YubiKey version/serial (may trigger LED)...")
-    print("** WATCH THE YUBIKEY LED NOW **")
-    print()
+    log("Method: Read YubiKey version/serial (may trigger LED)...")
+    log("** WATCH THE YUBIKEY LED NOW **")
+    log()
+    log.flush()  # show the cue before the probe runs
 
     try:
-        with device.open_connection(SmartCardConnection) as _conn:
-            conn = cast(ScardSmartCardConnection, _conn)
-            #piv = PivSession(_conn)  # PivSession still needs the original SmartCardConnection
+        scard = cast(ScardSmartCardConnection, conn)
 
-            # Get version - this is a YubiKey-specific command
-            # APDU: 00 F7 00 00 (GET VERSION)
-            print("Sending GET VERSION command...")
-            apdu = [0x00, 0xF7, 0x00, 0x00]
-            response, sw1, sw2 = conn.connection.transmit(apdu)
+        # Get version - this is a YubiKey-specific command
+        # APDU: 00 F7 00 00 (GET VERSION)
+        log("Sending GET VERSION command...")
+        response, sw1, sw2 = scard.connection.transmit(_APDU_GET_VERSION)
 
-            if sw1 == 0x90 and sw2 == 0x00:
-                version = f"{response[0]}.{response[1]}.{response[2]}"
-                print(f"  ✓ Version response: {version}")
+        if sw1 == 0x90 and sw2 == 0x00:
+            version = f"{response[0]}.{response[1]}.{response[2]}"
+            log(f"  ✓ Version response: {version}")
 
+        if _SLOW_LED:
             time.sleep(0.5)
 
-            # Get serial number - another YubiKey-specific command
-            # APDU: 00 F8 00 00 (GET SERIAL)
-            print("Sending GET SERIAL command...")
-            apdu = [0x00, 0xF8, 0x00, 0x00]
-            response, sw1, sw2 = conn.connection.transmit(apdu)
+        # Get serial number - another YubiKey-specific command
+        # APDU: 00 F8 00 00 (GET SERIAL)
+        log("Sending GET SERIAL command...")
+        response, sw1, sw2 = scard.connection.transmit(_APDU_GET_SERIAL)
 
-            if sw1 == 0x90 and sw2 == 0x00:
-                serial = int.from_bytes(bytes(response), 'big')
-                print(f"  ✓ Serial response: {serial}")
-                if serial == info.serial:
-                    print( "  ✓✓ Matches ykman-reported serial!")
+        if sw1 == 0x90 and sw2 == 0x00 and len(response) >= 4:
+            # pyscard returns a list of ints: assemble the big-endian
+            # 32-bit serial directly rather than via bytes()
+            serial = (
+                (response[0] << 24) | (response[1] << 16)
+                | (response[2] << 8) | response[3]
+            )
+            log(f"  ✓ Serial response: {serial}")
+            if serial == info.serial:
+                log( "  ✓✓ Matches ykman-reported serial!")
 
-            print()
+        log()
 
     except Exception as e:
-        print(f"Error: {e}")
+        log(f"Error: {e}")
         import traceback
+        log.flush()
         traceback.print_exc()
 
     return True
@@ -313,43 +327,51 @@ def test_4_raw_apdu_blink() -> bool:
 
 def main() -> int:
     """Run all verification tests."""
-    print("\n")
-    print("╔" + "═" * 68 + "╗")
-    print("║" + " " * 68 + "║")
-    print("║" + "ykman API End-to-End Connectivity Verification".center(68) + "║")
-    print("║" + " " * 68 + "║")
-    print("╚" + "═" * 68 + "╝")
-    print()
+    sys.stdout.write(_BANNER)
 
     results = {}
 
     try:
-        # Test 1: Basic connectivity
-        results['device_selection'] = test_1_device_selection()
-
-        if not results['device_selection']:
-            print("\n✗ Basic connectivity failed, stopping tests")
+        # Enumerate once; every test drives the same key
+        devices = list(list_all_devices())
+        if not devices:
+            print("✗ No YubiKeys found")
             return 1
+        device, info = devices[0]
 
-        print()
+        # One connection for the whole suite: each open costs an
+        # SCardConnect, and every test talks to the same key
+        with device.open_connection(SmartCardConnection) as conn:
+            # Test 1: Basic connectivity
+            results['device_selection'] = test_1_device_selection(conn, info)
+            log.flush()
 
-        # Test 2: LED blinking
-        results['led_blink'] = test_2_blink_yubikey()
+            if not results['device_selection']:
+                print("\n✗ Basic connectivity failed, stopping tests")
+                return 1
 
-        print()
+            print()
 
-        # Test 3: Touch slots
-        results['touch_slots'] = test_3_touch_required_operation()
+            # Test 2: LED blinking
+            results['led_blink'] = test_2_blink_yubikey(conn, info)
+            log.flush()
 
-        print()
+            print()
+
+            # Test 3: Touch slots
+            results['touch_slots'] = test_3_touch_required_operation(conn, info)
+            log.flush()
+
+            print()
 
-        # Test 4: Raw APDU
-        results['raw_apdu'] = test_4_raw_apdu_blink()
+            # Test 4: Raw APDU
+            results['raw_apdu'] = test_4_raw_apdu_blink(conn, info)
+            log.flush()
 
         # Summary
-        print("=" * 70)
+        print(_BAR70)
         print("VERIFICATION SUMMARY")
-        print("=" * 70)
+        print(_BAR70)
         print()
 
         for test, passed in results.items():
@@ -368,14 +390,16 @@ def main() -> int:
             print("  - Best test: use a slot with touch policy set")
 
         print()
-        print("=" * 70)
+        print(_BAR70)
 
         return 0
 
     except KeyboardInterrupt:
+        log.flush()
         print("\n\nInterrupted by user")
         return 130
     except Exception as e:
+        log.flush()
         print(f"\n\nERROR: {e}")
         import traceback
         traceback.print_exc()
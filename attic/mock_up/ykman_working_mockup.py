@@ -22,12 +22,27 @@ Key findings:
 
 from __future__ import annotations
 
+import contextlib
+import io
 import sys
-from typing import Protocol, cast
+from typing import Any, Callable, Protocol, TypeVar, cast
 
 from ykman.pcsc import YkmanDevice
 from yubikit.core.smartcard import SmartCardConnection
 from yubikit.management import DeviceInfo
+from yubikit.piv import PivSession
+
+from _bertlv import parse_tlv
+from _device_cache import list_pcsc_devices_cached, pcsc_device_by_serial
+
+# yblob magic number 0xF2ED5F0B as stored on the key (little-endian)
+_YBLOB_MAGIC = (0xF2ED5F0B).to_bytes(4, 'little')
+
+# GET DATA header up to the 3-byte object id: 00 CB 3F FF 05 5C 03
+_GET_DATA_PREFIX = b'\x00\xcb\x3f\xff\x05\x5c\x03'
+
+# GET RESPONSE header, completed by the Le byte from SW 61xx
+_GET_RESPONSE_PREFIX = b'\x00\xc0\x00\x00'
 
 
 class PcscConnection(Protocol):
@@ -43,6 +58,10 @@ class PcscConnection(Protocol):
         """
         ...
 
+    def getATR(self) -> list[int]:
+        """Return the card's Answer-To-Reset as list of bytes."""
+        ...
+
 
 class ScardSmartCardConnection(Protocol):
     """Protocol for ykman.pcsc.ScardSmartCardConnection.
@@ -65,59 +84,130 @@ class ScardSmartCardConnection(Protocol):
 
 
 def list_yubikeys() -> list[tuple[YkmanDevice, DeviceInfo]]:
-    """List all connected YubiKeys with their serial numbers."""
-    from ykman.device import list_all_devices
+    """List all connected YubiKeys with their serial numbers.
 
-    devices = list(list_all_devices())
-    return devices
+    Only keys with the CCID (smart card) interface are listed, which is all
+    the PIV demos can use; their device info is read concurrently.  The
+    enumeration is reused for 2 seconds, so the demos that select a key
+    by serial right after listing do not walk every reader again; call
+    _device_cache.invalidate_device_cache() to force a fresh scan.
+    """
+    return list_pcsc_devices_cached(ttl=2.0)
 
 
 def select_yubikey_by_serial(serial: int) -> tuple[YkmanDevice, DeviceInfo] | None:
     """Find and return YubiKey device with matching serial number."""
-    devices = list_yubikeys()
-
-    for device, info in devices:
-        if info.serial == serial:
-            return (device, info)
+    return pcsc_device_by_serial(serial, ttl=2.0)
 
-    return None
 
-
-def read_piv_object(connection: ScardSmartCardConnection, object_id: int) -> bytes | None:
+def read_piv_object(
+    connection: ScardSmartCardConnection,
+    object_id: int,
+    rx_buf: bytearray | None = None,
+) -> bytes | None:
     """
     Read a PIV object using raw APDU.
 
     Args:
         connection: ScardSmartCardConnection (after PIV applet selected)
         object_id: PIV object ID (e.g., 0x5f0000)
+        rx_buf: Optional caller-owned buffer, reused to gather responses
+            that arrive in several pieces (SW 61xx)
 
     Returns:
         Object data (without TLV wrapper) or None if not found
+
+    Raises:
+        ValueError: the response is not a well-formed tag 0x53 TLV
+        RuntimeError: the card returned an error status
     """
     # Build GET DATA APDU: 00 CB 3F FF <len> 5C <id_len> <object_id>
-    obj_bytes = object_id.to_bytes(3, 'big')
-    data = [0x5C, 0x03] + list(obj_bytes)
-    apdu = [0x00, 0xCB, 0x3F, 0xFF, len(data)] + data
-
-    response, sw1, sw2 = connection.connection.transmit(apdu)
-
-    if sw1 == 0x90 and sw2 == 0x00:
-        # Success - parse TLV response (tag 0x53)
-        if response[0] == 0x53:
-            # Parse length
-            if response[1] < 0x80:
-                payload_start = 2
-            elif response[1] == 0x82:
-                payload_start = 4
-            else:
-                payload_start = 2
-
-            return bytes(response[payload_start:])
-    elif sw1 == 0x6a and sw2 == 0x82:
+    apdu = _GET_DATA_PREFIX + object_id.to_bytes(3, 'big')
+
+    # yubikit's send_and_receive() takes and returns bytes, no list round trip
+    response, sw = connection.send_and_receive(apdu)
+
+    # The connection does not chain responses itself: SW 61xx means more
+    # data is waiting, fetch it with GET RESPONSE.  Pieces are written in
+    # place into the buffer and parsed through a view, without a final copy.
+    if sw >> 8 == 0x61:
+        buf = rx_buf if rx_buf is not None else bytearray()
+        end = len(response)
+        buf[:end] = response
+        while sw >> 8 == 0x61:
+            response, sw = connection.send_and_receive(
+                _GET_RESPONSE_PREFIX + bytes((sw & 0xFF,))
+            )
+            buf[end:end + len(response)] = response
+            end += len(response)
+        response = memoryview(buf)[:end]
+
+    if sw == 0x9000:
+        # Success - parse TLV response (tag 0x53); parse_tlv() decodes
+        # short and long-form (0x81, 0x82, ...) lengths alike and checks the
+        # length against the response before anything is sliced
+        tag, value, end = parse_tlv(response)
+        if tag != 0x53:
+            raise ValueError(f"PIV GET DATA: expected tag 0x53, got 0x{tag:02x}")
+        if end != len(response):
+            raise ValueError(
+                f"PIV GET DATA: {len(response) - end} trailing bytes after"
+                f" the 0x53 TLV (ends at {end} of {len(response)})"
+            )
+        return bytes(value)
+    elif sw == 0x6a82:
         # Object not found
         return None
     else:
-        raise RuntimeError(f"PIV GET DATA failed: {sw1:02x}{sw2:02x}")
+        raise RuntimeError(f"PIV GET DATA failed: {sw:04x}")
+
+
+def supports_extended_apdu(atr: list[int]) -> bool:
+    """
+    Check whether an ATR advertises extended-length APDUs.
+
+    Looks for the card capabilities object (compact-TLV tag 7, ISO 7816-4)
+    in the historical bytes; its third byte has bit 0x40 set when extended
+    Lc/Le fields are supported.
+    """
+    if len(atr) < 2:
+        return False
+
+    # Skip the interface bytes: each TDi announces the next TA/TB/TC/TD group
+    hist_len = atr[1] & 0x0F
+    i = 1
+    y = atr[1] >> 4
+    while True:
+        i += bin(y).count('1')
+        if not y & 0x08 or i >= len(atr):
+            break
+        y = atr[i] >> 4
+    hist = atr[i + 1:i + 1 + hist_len]
+
+    # Only category indicator 0x80 (compact-TLV objects follow) is handled
+    if not hist or hist[0] != 0x80:
+        return False
+    pos = 1
+    while pos < len(hist):
+        tag, length = hist[pos] >> 4, hist[pos] & 0x0F
+        value = hist[pos + 1:pos + 1 + length]
+        if tag == 0x7 and len(value) >= 3:
+            return bool(value[2] & 0x40)
+        pos += 1 + length
+    return False
+
+
+def encode_tlv_header(tag: int, length: int) -> bytes:
+    """
+    Encode a single-byte tag followed by its BER length.
+
+    Short form below 128; otherwise 0x80 | n followed by the n big-endian
+    length bytes, n taken from the length's bit length (0x81, 0x82, ...).
+    """
+    if length < 0x80:
+        return bytes((tag, length))
+    n = (length.bit_length() + 7) // 8
+    return bytes((tag, 0x80 | n)) + length.to_bytes(n, 'big')
 
 
 def write_piv_object(connection: ScardSmartCardConnection, object_id: int, data: bytes) -> None:
@@ -133,28 +223,73 @@ def write_piv_object(connection: ScardSmartCardConnection, object_id: int, data:
     obj_bytes = object_id.to_bytes(3, 'big')
 
     # Build TLV: 5C 03 <object_id> 53 <data_len> <data>
-    # Length encoding for tag 0x53
-    if len(data) < 128:
-        tlv = [0x5C, 0x03] + list(obj_bytes) + [0x53, len(data)] + list(data)
-    elif len(data) <= 255:
-        tlv = [0x5C, 0x03] + list(obj_bytes) + [0x53, 0x81, len(data)] + list(data)
-    elif len(data) <= 65535:
-        tlv = [0x5C, 0x03] + list(obj_bytes) + [0x53, 0x82, len(data) >> 8, len(data) & 0xFF] + list(data)
-    else:
+    # in one buffer, copying `data` once
+    if len(data) > 65535:
         raise ValueError(f"Data too large: {len(data)} bytes")
+    tlv = bytearray(b'\x5c\x03')
+    tlv += obj_bytes
+    tlv += encode_tlv_header(0x53, len(data))
+    tlv += data
 
     # Check if we need extended APDU
     if len(tlv) <= 255:
         # Standard APDU
-        apdu = [0x00, 0xDB, 0x3F, 0xFF, len(tlv)] + tlv
-    else:
+        apdus = [bytes((0x00, 0xDB, 0x3F, 0xFF, len(tlv))) + tlv]
+    elif supports_extended_apdu(connection.connection.getATR()):
         # Extended APDU: 00 DB 3F FF 00 <len_hi> <len_lo> <data>
-        apdu = [0x00, 0xDB, 0x3F, 0xFF, 0x00, len(tlv) >> 8, len(tlv) & 0xFF] + tlv
+        apdus = [b'\x00\xdb\x3f\xff\x00' + len(tlv).to_bytes(2, 'big') + tlv]
+    else:
+        # Command chaining (ISO 7816-4): 255-byte blocks, CLA 0x10 on all
+        # but the last one
+        apdus = []
+        for offset in range(0, len(tlv), 255):
+            chunk = tlv[offset:offset + 255]
+            cla = 0x10 if offset + 255 < len(tlv) else 0x00
+            apdus.append(bytes((cla, 0xDB, 0x3F, 0xFF, len(chunk))) + chunk)
+
+    for apdu in apdus:
+        # bytes in, bytes out: any list marshaling for pyscard happens once,
+        # inside yubikit, as for read_piv_object()
+        _, sw = connection.send_and_receive(apdu)
+
+        if sw != 0x9000:
+            raise RuntimeError(f"PIV PUT DATA failed: {sw:04x}")
+
+
+class YkSession:
+    """
+    One open connection to a YubiKey with the PIV applet selected.
+
+    Opening a connection and selecting the applet costs several APDU round
+    trips; demos that work on the same key share one session instead.
+    """
 
-    response, sw1, sw2 = connection.connection.transmit(apdu)
+    def __init__(self, device: YkmanDevice, info: DeviceInfo) -> None:
+        self.device = device
+        self.info = info
+        # Receive buffer shared by all reads in this session (extended APDU
+        # maximum; grows on its own if ever exceeded)
+        self._rx_buf = bytearray(65536)
 
-    if sw1 != 0x90 or sw2 != 0x00:
-        raise RuntimeError(f"PIV PUT DATA failed: {sw1:02x}{sw2:02x}")
+    def __enter__(self) -> YkSession:
+        self._conn = self.device.open_connection(SmartCardConnection)
+        self.connection = cast(ScardSmartCardConnection, self._conn)
+        # PivSession needs the original SmartCardConnection; it selects the
+        # applet once, and lives exactly as long as the connection
+        self.piv = PivSession(self._conn)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        del self.piv
+        self._conn.close()
+
+    def read_object(self, object_id: int) -> bytes | None:
+        """Read a PIV object, see read_piv_object()."""
+        return read_piv_object(self.connection, object_id, self._rx_buf)
+
+    def write_object(self, object_id: int, data: bytes) -> None:
+        """Write a PIV object, see write_piv_object()."""
+        write_piv_object(self.connection, object_id, data)
 
 
 def demo_1_list_devices() -> list[tuple[YkmanDevice, DeviceInfo]]:
@@ -183,7 +318,7 @@ def demo_1_list_devices() -> list[tuple[YkmanDevice, DeviceInfo]]:
     return devices
 
 
-def demo_2_select_by_serial(serial: int) -> tuple[object, object] | None:
+def demo_2_select_by_serial(serial: int) -> tuple[YkmanDevice, DeviceInfo] | None:
     """Demo 2: Select a specific YubiKey by serial number."""
     print("=" * 70)
     print(f"DEMO 2: Select YubiKey by serial number ({serial})")
@@ -204,80 +339,43 @@ def demo_2_select_by_serial(serial: int) -> tuple[object, object] | None:
     return result
 
 
-def demo_3_read_custom_object(serial: int | None = None) -> None:
+def demo_3_read_custom_object(session: YkSession) -> None:
     """Demo 3: Read custom PIV object (0x5f0000)."""
-    from yubikit.piv import PivSession
-
     print("=" * 70)
     print("DEMO 3: Read custom PIV object (0x5f0000)")
     print("=" * 70)
 
-    # Select device
-    if serial is not None:
-        result = select_yubikey_by_serial(serial)
-        if not result:
-            return
-        device, info = result
-    else:
-        devices = list_yubikeys()
-        if not devices:
-            print("\nNo YubiKeys found")
-            return
-        device, info = devices[0]
-
-    print(f"\nReading from YubiKey {info.serial}...\n")
-
-    # Open connection and create PIV session
-    with device.open_connection(SmartCardConnection) as _conn:
-        connection = cast(ScardSmartCardConnection, _conn)
-        # Create PIV session (selects applet)
-        piv = PivSession(_conn)  # PivSession needs the original SmartCardConnection
-        print(f"PIV applet selected, version: {piv.version}")
-
-        # Read custom object
-        try:
-            data = read_piv_object(connection, 0x5f0000)
-
-            if data is None:
-                print("✗ Object 0x5f0000 not found (may not be formatted)")
-            else:
-                print(f"✓ Read {len(data)} bytes from object 0x5f0000")
-                print(f"  First 32 bytes (hex): {data[:32].hex()}")
-
-                # Check for yblob magic
-                if len(data) >= 4:
-                    magic = int.from_bytes(data[:4], 'little')
-                    print(f"  Magic number: {hex(magic)}")
-                    if magic == 0xF2ED5F0B:
-                        print("  ✓ Valid yblob magic!")
-        except Exception as e:
-            print(f"✗ Error: {e}")
+    print(f"\nReading from YubiKey {session.info.serial}...\n")
+    print(f"PIV applet selected, version: {session.piv.version}")
+
+    # Read custom object
+    try:
+        data = session.read_object(0x5f0000)
+
+        if data is None:
+            print("✗ Object 0x5f0000 not found (may not be formatted)")
+        else:
+            print(f"✓ Read {len(data)} bytes from object 0x5f0000")
+            print(f"  First 32 bytes (hex): {data[:32].hex()}")
+
+            # Check for yblob magic
+            if len(data) >= 4:
+                print(f"  Magic number: {hex(int.from_bytes(data[:4], 'little'))}")
+                if data.startswith(_YBLOB_MAGIC):
+                    print("  ✓ Valid yblob magic!")
+    except Exception as e:
+        print(f"✗ Error: {e}")
 
     print()
 
 
-def demo_4_write_read_roundtrip(serial: int | None = None) -> None:
+def demo_4_write_read_roundtrip(session: YkSession) -> None:
     """Demo 4: Write and read custom PIV object."""
-    from yubikit.piv import PivSession
-
     print("=" * 70)
     print("DEMO 4: Write and read custom PIV object (roundtrip)")
     print("=" * 70)
 
-    # Select device
-    if serial is not None:
-        result = select_yubikey_by_serial(serial)
-        if not result:
-            return
-        device, info = result
-    else:
-        devices = list_yubikeys()
-        if not devices:
-            print("\nNo YubiKeys found")
-            return
-        device, info = devices[0]
-
-    print(f"\nTesting on YubiKey {info.serial}...\n")
+    print(f"\nTesting on YubiKey {session.info.serial}...\n")
 
     # Test data with yblob magic
     test_data = (
@@ -290,43 +388,38 @@ def demo_4_write_read_roundtrip(serial: int | None = None) -> None:
     print(f"  First 32 bytes: {test_data[:32].hex()}")
     print()
 
-    # Open connection
-    with device.open_connection(SmartCardConnection) as _conn:
-        connection = cast(ScardSmartCardConnection, _conn)
-        # Create PIV session
-        piv = PivSession(_conn)  # PivSession needs the original SmartCardConnection
-        print(f"PIV applet selected, version: {piv.version}\n")
-
-        # Write object
-        try:
-            print("Writing to object 0x5f0001...")
-            write_piv_object(connection, 0x5f0001, test_data)
-            print("✓ Write successful\n")
-        except Exception as e:
-            print(f"✗ Write failed: {e}\n")
-            return
+    print(f"PIV applet selected, version: {session.piv.version}\n")
 
-        # Read back
-        try:
-            print("Reading back from object 0x5f0001...")
-            read_data = read_piv_object(connection, 0x5f0001)
+    # Write object
+    try:
+        print("Writing to object 0x5f0001...")
+        session.write_object(0x5f0001, test_data)
+        print("✓ Write successful\n")
+    except Exception as e:
+        print(f"✗ Write failed: {e}\n")
+        return
 
-            if read_data is None:
-                print("✗ Read failed: object not found")
-                return
+    # Read back
+    try:
+        print("Reading back from object 0x5f0001...")
+        read_data = session.read_object(0x5f0001)
 
-            print(f"✓ Read {len(read_data)} bytes\n")
+        if read_data is None:
+            print("✗ Read failed: object not found")
+            return
 
-            # Verify
-            if read_data == test_data:
-                print("✓✓ VERIFICATION SUCCESS: Data matches!")
-            else:
-                print("✗ VERIFICATION FAILED: Data mismatch")
-                print(f"  Expected: {test_data[:32].hex()}")
-                print(f"  Got:      {read_data[:32].hex()}")
+        print(f"✓ Read {len(read_data)} bytes\n")
 
-        except Exception as e:
-            print(f"✗ Read failed: {e}")
+        # Verify
+        if read_data == test_data:
+            print("✓✓ VERIFICATION SUCCESS: Data matches!")
+        else:
+            print("✗ VERIFICATION FAILED: Data mismatch")
+            print(f"  Expected: {test_data[:32].hex()}")
+            print(f"  Got:      {read_data[:32].hex()}")
+
+    except Exception as e:
+        print(f"✗ Read failed: {e}")
 
     print()
 
@@ -387,6 +480,20 @@ def demo_5_comparison() -> None:
     print()
 
 
+_T = TypeVar('_T')
+
+
+def run_buffered(demo: Callable[..., _T], *args: Any) -> _T:
+    """Run `demo`, collecting what it prints and writing it out in one go."""
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf):
+            return demo(*args)
+    finally:
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+
 def main() -> int:
     """Run all demos."""
     print("\n")
@@ -400,7 +507,7 @@ def main() -> int:
 
     try:
         # Demo 1: List all devices
-        devices = demo_1_list_devices()
+        devices = run_buffered(demo_1_list_devices)
 
         if not devices:
             print("\nNo YubiKeys found. Please connect a YubiKey to continue.")
@@ -411,16 +518,20 @@ def main() -> int:
         assert first_serial is not None
 
         # Demo 2: Select by serial
-        demo_2_select_by_serial(first_serial)
+        selected = run_buffered(demo_2_select_by_serial, first_serial)
+        if selected is None:
+            return 1
 
-        # Demo 3: Read custom object
-        demo_3_read_custom_object(first_serial)
+        # Demos 3 and 4 share one connection and PIV session
+        with YkSession(*selected) as session:
+            # Demo 3: Read custom object
+            run_buffered(demo_3_read_custom_object, session)
 
-        # Demo 4: Write/read roundtrip
-        demo_4_write_read_roundtrip(first_serial)
+            # Demo 4: Write/read roundtrip
+            run_buffered(demo_4_write_read_roundtrip, session)
 
         # Demo 5: Comparison
-        demo_5_comparison()
+        run_buffered(demo_5_comparison)
 
         print("=" * 70)
         print("All demos completed successfully!")
@@ -12,12 +12,12 @@ Uses prompt_toolkit for arrow-key navigation and flashes the selected YubiKey.
 
 from __future__ import annotations
 
+import asyncio
 import sys
-import threading
-import time
 from typing import Protocol, cast
 
 from prompt_toolkit import Application
+from prompt_toolkit.application import get_app
 from prompt_toolkit.formatted_text import FormattedText
 from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.layout import Layout
@@ -25,6 +25,11 @@ from prompt_toolkit.layout.containers import Window
 from prompt_toolkit.layout.controls import FormattedTextControl
 
 
+# GET VERSION command - quick and causes LED flash.  pyscard's transmit()
+# takes a list of ints, so one shared list is built at import time.
+_APDU_GET_VERSION: list[int] = [0x00, 0xF7, 0x00, 0x00]
+
+
 class PcscConnection(Protocol):
     """Protocol for pyscard connection object (accessed via conn.connection)."""
 
@@ -43,17 +48,29 @@ class ScardSmartCardConnection(Protocol):
         ...
 
 
-def flash_yubikey_continuously(serial: int, stop_event: threading.Event) -> None:
+async def flash_yubikey_async(serial: int, stop_event: asyncio.Event) -> None:
     """
     Flash the LED of the YubiKey with the given serial number continuously.
 
-    Continues flashing until stop_event is set.
+    Continues flashing until stop_event is set.  The blocking PC/SC calls run
+    in the loop's default executor, so the flashing shares the event loop of
+    the interactive UI instead of needing its own thread.
     """
+    loop = asyncio.get_running_loop()
+
+    async def stopped(timeout: float) -> bool:
+        """Wait up to `timeout` seconds; True as soon as stop_event is set."""
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
     try:
         from ykman.device import list_all_devices
         from yubikit.core.smartcard import SmartCardConnection
 
-        devices = list_all_devices()
+        devices = await loop.run_in_executor(None, list_all_devices)
         device_obj = None
         for device, info in devices:
             if info.serial == serial:
@@ -63,30 +80,68 @@ def flash_yubikey_continuously(serial: int, stop_event: threading.Event) -> None
         if device_obj is None:
             return
 
-        # Flash continuously until stopped
+        # Flash continuously until stopped, over one long-lived connection;
+        # the outer loop only reopens it if the connection is lost
         while not stop_event.is_set():
             try:
-                with device_obj.open_connection(SmartCardConnection) as _conn:
-                    conn = cast(ScardSmartCardConnection, _conn)
-                    # GET VERSION command - quick and causes LED flash
-                    apdu = [0x00, 0xF7, 0x00, 0x00]
-                    conn.connection.transmit(apdu)
-
-                # Wait a bit before next flash (avoid excessive polling)
-                # Check stop_event more frequently for responsiveness
-                for _ in range(3):  # 3 x 100ms = 300ms between flashes
-                    if stop_event.is_set():
-                        break
-                    time.sleep(0.1)
+                _conn = await loop.run_in_executor(
+                    None, device_obj.open_connection, SmartCardConnection
+                )
+                conn = cast(ScardSmartCardConnection, _conn)
+                transmit: asyncio.Future[object] | None = None
+                try:
+                    while True:
+                        transmit = loop.run_in_executor(
+                            None, conn.connection.transmit, _APDU_GET_VERSION
+                        )
+                        # Shielded: a cancel (e.g. the app exiting) must not
+                        # leave the transmit running on a handle we close
+                        await asyncio.shield(transmit)
+
+                        # Wait a bit before next flash (avoid excessive polling);
+                        # returns as soon as stop_event is set
+                        if await stopped(0.3):
+                            break
+                finally:
+                    if transmit is not None:
+                        await asyncio.wait([transmit])
+                    _conn.close()
             except Exception:
                 # Ignore errors and continue flashing
-                if not stop_event.is_set():
-                    time.sleep(0.1)
+                if await stopped(0.1):
+                    break
     except Exception:
         # Silently ignore errors during flashing
         pass
 
 
+def flash_yubikey_continuously(serial: int, stop_fd: int) -> None:
+    """Blocking wrapper around flash_yubikey_async() for thread-based callers.
+
+    `stop_fd` is the read end of a pipe: writing a byte to the other end stops
+    the flashing.  The loop's selector watches it directly, so the wakeup is
+    immediate and needs no relay thread.
+    """
+
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        done = asyncio.Event()
+
+        def on_stop() -> None:
+            # The selector is level-triggered: unregister before the loop
+            # polls again, or the unread byte keeps firing this callback.
+            loop.remove_reader(stop_fd)
+            done.set()
+
+        loop.add_reader(stop_fd, on_stop)
+        try:
+            await flash_yubikey_async(serial, done)
+        finally:
+            loop.remove_reader(stop_fd)
+
+    asyncio.run(run())
+
+
 class YubiKeySelector:
     """Interactive YubiKey selector with arrow-key navigation and LED feedback."""
 
@@ -95,8 +150,7 @@ class YubiKeySelector:
         self.devices = devices
         self.selected_index = 0
         self.selected_serial: int | None = None
-        self.flash_thread: threading.Thread | None = None
-        self.stop_flash_event: threading.Event | None = None
+        self.stop_flash_event: asyncio.Event | None = None
 
     def get_formatted_text(self) -> FormattedText:
         """Generate the formatted text for the menu display."""
@@ -122,23 +176,20 @@ class YubiKeySelector:
         return FormattedText(lines)
 
     def flash_selected(self) -> None:
-        """Flash the currently selected YubiKey continuously in a background thread."""
-        # Stop any existing flashing thread
+        """Flash the currently selected YubiKey continuously in a background task."""
+        # Stop any existing flashing task
         if self.stop_flash_event is not None:
             self.stop_flash_event.set()
-        if self.flash_thread is not None and self.flash_thread.is_alive():
-            self.flash_thread.join(timeout=0.5)
 
-        # Start new flashing thread for currently selected device
+        # Start new flashing task for currently selected device; the
+        # application cancels any task still running when it exits
         if 0 <= self.selected_index < len(self.devices):
             serial = self.devices[self.selected_index][0]
-            self.stop_flash_event = threading.Event()
-            self.flash_thread = threading.Thread(
-                target=flash_yubikey_continuously,
-                args=(serial, self.stop_flash_event),
-                daemon=True
-            )
-            self.flash_thread.start()
+            self.stop_flash_event = asyncio.Event()
+            if serial is not None:
+                get_app().create_background_task(
+                    flash_yubikey_async(serial, self.stop_flash_event)
+                )
 
     def move_up(self) -> None:
         """Move selection up."""
@@ -162,9 +213,6 @@ class YubiKeySelector:
 
     def run(self) -> int | None:
         """Run the interactive selector and return the selected serial."""
-        # Flash the initially selected YubiKey
-        self.flash_selected()
-
         # Create key bindings
         kb = KeyBindings()
 
@@ -199,7 +247,8 @@ class YubiKeySelector:
             layout=layout, key_bindings=kb, full_screen=False, mouse_support=False
         )
 
-        app.run()
+        # Flash the initially selected YubiKey once the event loop is running
+        app.run(pre_run=self.flash_selected)
 
         return self.selected_serial
 
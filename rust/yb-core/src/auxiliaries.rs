@@ -7,7 +7,6 @@
 
 use crate::piv::PivBackend;
 use anyhow::{bail, Result};
-use std::collections::HashMap;
 
 // PIV object IDs used for metadata.
 pub const OBJ_ADMIN_DATA: u32 = 0x5F_FF00;
@@ -29,30 +28,61 @@ const TAG_IS_DEFAULT: u8 = 0x05;
 // TLV parser
 // ---------------------------------------------------------------------------
 
-/// Parse a flat BER-TLV sequence (single-byte tags) into a tag→value map.
-pub(crate) fn parse_tlv_flat(data: &[u8]) -> HashMap<u8, Vec<u8>> {
-    let mut map = HashMap::new();
-    let mut i = 0;
-    while i < data.len() {
-        let tag = data[i];
-        i += 1;
-        if i >= data.len() {
-            break;
+/// Zero-copy walk over a flat BER-TLV sequence (single-byte tags).
+///
+/// Yields `(tag, value)` with `value` borrowed from the input, so callers
+/// that only need one or two tags never copy the others.  Stops at the end
+/// of the input or at the first truncated element.
+pub(crate) struct TlvIter<'a> {
+    data: &'a [u8],
+    pos: usize,
+}
+
+impl<'a> TlvIter<'a> {
+    pub(crate) fn new(data: &'a [u8]) -> Self {
+        Self { data, pos: 0 }
+    }
+}
+
+impl<'a> Iterator for TlvIter<'a> {
+    type Item = (u8, &'a [u8]);
+
+    fn next(&mut self) -> Option<Self::Item> {
+        let data = self.data;
+        let i = self.pos;
+        if i + 1 >= data.len() {
+            return None;
         }
-        let (len, consumed) = decode_tlv_length(&data[i..]);
-        i += consumed;
-        if i + len > data.len() {
-            debug_assert!(
-                false,
-                "parse_tlv_flat: truncated TLV at offset {i} (tag=0x{tag:02x}, claimed len={len}, available={})",
-                data.len() - i
-            );
-            break;
+        let tag = data[i];
+        // Short-form lengths (< 0x80) are the common case; skip the decoder.
+        let (len, start) = match data[i + 1] {
+            n if n & 0x80 == 0 => (n as usize, i + 2),
+            _ => {
+                let (len, consumed) = decode_tlv_length(&data[i + 1..]);
+                (len, i + 1 + consumed)
+            }
+        };
+        match data.get(start..start + len) {
+            Some(value) => {
+                self.pos = start + len;
+                Some((tag, value))
+            }
+            None => {
+                debug_assert!(
+                    false,
+                    "TlvIter: truncated TLV at offset {start} (tag=0x{tag:02x}, claimed len={len}, available={})",
+                    data.len() - start
+                );
+                self.pos = data.len();
+                None
+            }
         }
-        map.insert(tag, data[i..i + len].to_vec());
-        i += len;
     }
-    map
+}
+
+/// Return the value of the first `tag` element in a flat TLV sequence.
+pub(crate) fn tlv_find(data: &[u8], tag: u8) -> Option<&[u8]> {
+    TlvIter::new(data).find(|&(t, _)| t == tag).map(|(_, v)| v)
 }
 
 pub(crate) fn decode_tlv_length(data: &[u8]) -> (usize, usize) {
@@ -63,28 +93,39 @@ pub(crate) fn decode_tlv_length(data: &[u8]) -> (usize, usize) {
         (data[0] as usize, 1)
     } else {
         let n = (data[0] & 0x7f) as usize;
-        if data.len() < 1 + n {
-            return (0, 1);
-        }
-        let mut len = 0usize;
-        for b in &data[1..1 + n] {
-            len = (len << 8) | (*b as usize);
-        }
+        let bytes = match data.get(1..1 + n) {
+            None => return (0, 1),
+            Some(b) => b,
+        };
+        // 0x81 and 0x82 cover every PIV object; decode them directly.
+        let len = match *bytes {
+            [b] => b as usize,
+            [hi, lo] => u16::from_be_bytes([hi, lo]) as usize,
+            _ => bytes.iter().fold(0, |len, &b| (len << 8) | b as usize),
+        };
         (len, 1 + n)
     }
 }
 
 /// Parse `88 <len> [ 89 <len> <key_bytes> ]` from the PRINTED object value.
-pub(crate) fn extract_pin_protected_key(raw: &[u8]) -> Result<String> {
-    let outer = parse_tlv_flat(raw);
-    let inner_bytes = outer
-        .get(&0x88)
-        .ok_or_else(|| anyhow::anyhow!("PRINTED object missing tag 0x88"))?;
-    let inner = parse_tlv_flat(inner_bytes);
-    let key_bytes = inner
-        .get(&0x89)
+pub(crate) fn pin_protected_key_bytes(raw: &[u8]) -> Result<&[u8]> {
+    let inner =
+        tlv_find(raw, 0x88).ok_or_else(|| anyhow::anyhow!("PRINTED object missing tag 0x88"))?;
+    let key_bytes = tlv_find(inner, 0x89)
         .ok_or_else(|| anyhow::anyhow!("PRINTED object missing tag 0x89 inside 0x88"))?;
-    Ok(hex::encode(key_bytes))
+    // 3DES / AES-192 (24 bytes), AES-128 (16) or AES-256 (32).
+    if !matches!(key_bytes.len(), 16 | 24 | 32) {
+        bail!(
+            "PRINTED object: management key has invalid length {}",
+            key_bytes.len()
+        );
+    }
+    Ok(key_bytes)
+}
+
+/// Same as [`pin_protected_key_bytes`], hex-encoded.
+pub(crate) fn extract_pin_protected_key(raw: &[u8]) -> Result<String> {
+    pin_protected_key_bytes(raw).map(hex::encode)
 }
 
 /// Parse a `/`-separated subject string like `"CN=foo/O=bar"` into an rcgen `DistinguishedName`.
@@ -121,6 +162,13 @@ impl DefaultCredentials {
     }
 }
 
+/// Whether a GET METADATA response reports the factory-default value.
+///
+/// Only tag 0x05 is needed, so scan for it instead of building a TLV map.
+fn metadata_is_default(resp: &[u8]) -> bool {
+    tlv_find(resp, TAG_IS_DEFAULT).and_then(<[u8]>::first) == Some(&0x01)
+}
+
 /// Check whether the YubiKey still has default (insecure) credentials.
 ///
 /// Uses GET_METADATA APDU (firmware 5.3+).  On older firmware the check is
@@ -131,32 +179,28 @@ pub fn check_for_default_credentials(
     piv: &dyn PivBackend,
     allow_defaults: bool,
 ) -> Result<DefaultCredentials> {
-    let mut result = DefaultCredentials::default();
-    let mut labels = Vec::new();
-
-    for (label, apdu, field) in [
-        ("PIN", GET_METADATA_PIN.as_ref(), 0u8),
-        ("PUK", GET_METADATA_PUK.as_ref(), 1u8),
-        ("management key", GET_METADATA_MGMT.as_ref(), 2u8),
-    ] {
-        match piv.send_apdu(reader, apdu) {
-            Err(_) => {
-                // Firmware < 5.3 or APDU not supported — skip silently.
-                return Ok(DefaultCredentials::default());
-            }
-            Ok(resp) => {
-                let tlv = parse_tlv_flat(&resp);
-                if tlv.get(&TAG_IS_DEFAULT).map(|v| v.first()) == Some(Some(&0x01)) {
-                    labels.push(label);
-                    match field {
-                        0 => result.pin = true,
-                        2 => result.management_key = true,
-                        _ => {}
-                    }
-                }
-            }
+    // All three metadata queries go out in one card session.
+    let responses = match piv.send_apdus(
+        reader,
+        &[&GET_METADATA_PIN, &GET_METADATA_PUK, &GET_METADATA_MGMT],
+    ) {
+        Err(_) => {
+            // Firmware < 5.3 or APDU not supported — skip silently.
+            return Ok(DefaultCredentials::default());
         }
-    }
+        Ok(r) => r,
+    };
+    let [pin, puk, mgmt] =
+        [0, 1, 2].map(|i| responses.get(i).is_some_and(|r| metadata_is_default(r)));
+
+    let result = DefaultCredentials {
+        pin,
+        management_key: mgmt,
+    };
+    let labels: Vec<&str> = [(pin, "PIN"), (puk, "PUK"), (mgmt, "management key")]
+        .into_iter()
+        .filter_map(|(is_default, label)| is_default.then_some(label))
+        .collect();
 
     if labels.is_empty() {
         return Ok(result);
@@ -189,6 +233,21 @@ pub struct AdminData {
     pub pin_derived: bool,
 }
 
+impl AdminData {
+    /// Decode the ADMIN DATA bitfield (tag 0x81).
+    ///
+    /// Bit 0x01 = key stored in PRINTED object; bit 0x02 = key stored in
+    /// PROTECTED object.  We treat either bit as "PIN-protected mode".
+    /// Bit 0x04 = PIN-derived (deprecated).
+    pub const fn from_flags(flags: u8) -> Self {
+        Self {
+            puk_blocked: flags & 0x01 != 0,
+            mgmt_key_stored: flags & 0x03 != 0,
+            pin_derived: flags & 0x04 != 0,
+        }
+    }
+}
+
 /// Read and parse the ADMIN DATA object.
 pub fn parse_admin_data(reader: &str, piv: &dyn PivBackend) -> Result<AdminData> {
     let raw = match piv.read_object(reader, OBJ_ADMIN_DATA) {
@@ -196,25 +255,15 @@ pub fn parse_admin_data(reader: &str, piv: &dyn PivBackend) -> Result<AdminData>
         Ok(r) => r,
     };
 
-    let tlv = parse_tlv_flat(&raw);
     // Tag 0x80 contains a nested TLV; tag 0x81 inside holds the bitfield.
-    // Bits 0x01/0x02: mgmt key stored in PRINTED object (PIN-protected mode).
-    // Bit 0x04: PIN-derived (deprecated).
-    let flags = tlv
-        .get(&0x80)
-        .and_then(|inner_bytes| {
-            let inner = parse_tlv_flat(inner_bytes);
-            inner.get(&0x81).and_then(|v| v.first()).copied()
-        })
+    // Only that one byte is needed, so walk straight to it without maps.
+    let flags = tlv_find(&raw, 0x80)
+        .and_then(|inner| tlv_find(inner, 0x81))
+        .and_then(<[u8]>::first)
+        .copied()
         .unwrap_or(0);
 
-    Ok(AdminData {
-        puk_blocked: flags & 0x01 != 0,
-        // Bit 0x01 = key stored in PRINTED object; bit 0x02 = key stored in
-        // PROTECTED object.  We treat either bit as "PIN-protected mode".
-        mgmt_key_stored: flags & 0x03 != 0,
-        pin_derived: flags & 0x04 != 0,
-    })
+    Ok(AdminData::from_flags(flags))
 }
 
 /// Detect PIN-protected mode.
@@ -313,27 +362,55 @@ pub fn enable_pin_protected_management_key(
 mod tests {
     use super::*;
 
+    fn parse_tlv_flat(data: &[u8]) -> Vec<(u8, &[u8])> {
+        TlvIter::new(data).collect()
+    }
+
     #[test]
     fn tlv_simple() {
         // tag=0x05, len=1, value=0x01
         let data = [0x05u8, 0x01, 0x01];
-        let map = parse_tlv_flat(&data);
-        assert_eq!(map.get(&0x05), Some(&vec![0x01u8]));
+        assert_eq!(parse_tlv_flat(&data), [(0x05, &[0x01u8][..])]);
     }
 
     #[test]
     fn tlv_multi_tag() {
         let data = [0x05u8, 0x01, 0x00, 0x06, 0x02, 0x03, 0x04];
-        let map = parse_tlv_flat(&data);
-        assert_eq!(map.get(&0x05), Some(&vec![0x00u8]));
-        assert_eq!(map.get(&0x06), Some(&vec![0x03u8, 0x04u8]));
+        assert_eq!(
+            parse_tlv_flat(&data),
+            [(0x05, &[0x00u8][..]), (0x06, &[0x03u8, 0x04u8][..])]
+        );
     }
 
     #[test]
     fn tlv_long_form_length() {
         // tag=0x01, length encoded as 0x81 0x03 (long form, 3 bytes), value=[0xAA,0xBB,0xCC]
         let data = [0x01u8, 0x81, 0x03, 0xAA, 0xBB, 0xCC];
-        let map = parse_tlv_flat(&data);
-        assert_eq!(map.get(&0x01), Some(&vec![0xAAu8, 0xBB, 0xCC]));
+        assert_eq!(parse_tlv_flat(&data), [(0x01, &[0xAAu8, 0xBB, 0xCC][..])]);
+    }
+
+    #[test]
+    fn admin_data_flags() {
+        let a = AdminData::from_flags(0x02);
+        assert!(!a.puk_blocked && a.mgmt_key_stored && !a.pin_derived);
+        let a = AdminData::from_flags(0x05);
+        assert!(a.puk_blocked && a.mgmt_key_stored && a.pin_derived);
+        assert!(!AdminData::from_flags(0x00).mgmt_key_stored);
+    }
+
+    #[test]
+    fn printed_object_key() {
+        let mut raw = vec![0x88u8, 26, 0x89, 24];
+        raw.extend_from_slice(&[0xAB; 24]);
+        assert_eq!(extract_pin_protected_key(&raw).unwrap(), "ab".repeat(24));
+        assert!(extract_pin_protected_key(&[0x88, 5, 0x89, 3, 1, 2, 3]).is_err());
+        assert!(extract_pin_protected_key(&[0x89, 1, 0]).is_err());
+    }
+
+    #[test]
+    fn tlv_find_borrows_value() {
+        let data = [0x05u8, 0x01, 0x00, 0x06, 0x02, 0x03, 0x04];
+        assert_eq!(tlv_find(&data, 0x06), Some(&data[5..7]));
+        assert_eq!(tlv_find(&data, 0x07), None);
     }
 }
@@ -43,6 +43,9 @@ pub struct ContextOptions {
     pub management_key: Option<String>,
     pub pin: Option<String>,
     pub allow_defaults: bool,
+    /// Skip the default-credential check.  Set for read-only commands that
+    /// need neither the PIN nor the management key (list, fsck).
+    pub skip_default_check: bool,
 }
 
 pub struct Context {
@@ -62,6 +65,9 @@ pub struct Context {
     pub debug: bool,
     pub quiet: bool,
     pub pin_protected: bool,
+    /// Management key read from the PRINTED object, cached after the first
+    /// `management_key_for_write()` so later writes skip the PIN round-trip.
+    pin_protected_key: RefCell<Option<Zeroizing<String>>>,
     /// Optional flash handle passed in from the interactive device picker.
     /// Kept alive so the LED continues to flash into the next prompt.
     /// Consumed by [`Context::take_flash`].
@@ -102,16 +108,18 @@ impl Context {
             &*device_picker,
         )?;
 
-        // Check for default credentials unless skipped by environment.
-        let defaults = if std::env::var("YB_SKIP_DEFAULT_CHECK").is_err() {
-            auxiliaries::check_for_default_credentials(
-                &selected_reader,
-                piv.as_ref(),
-                opts.allow_defaults,
-            )?
-        } else {
-            auxiliaries::DefaultCredentials::default()
-        };
+        // Check for default credentials unless skipped by the caller or by
+        // environment.
+        let defaults =
+            if !opts.skip_default_check && std::env::var("YB_SKIP_DEFAULT_CHECK").is_err() {
+                auxiliaries::check_for_default_credentials(
+                    &selected_reader,
+                    piv.as_ref(),
+                    opts.allow_defaults,
+                )?
+            } else {
+                auxiliaries::DefaultCredentials::default()
+            };
 
         // When --allow-defaults is set and credentials are still at factory
         // defaults, inject them automatically so the user is not prompted.
@@ -147,6 +155,7 @@ impl Context {
             debug,
             quiet,
             pin_protected,
+            pin_protected_key: RefCell::new(None),
             flash_handle,
         })
     }
@@ -191,6 +200,7 @@ impl Context {
             debug,
             quiet: false,
             pin_protected,
+            pin_protected_key: RefCell::new(None),
             flash_handle: None,
         })
     }
@@ -215,11 +225,15 @@ impl Context {
     /// Return the management key to use for write operations.
     ///
     /// Priority: explicit --key > PIN-protected retrieval > None (use default).
+    /// The PIN-protected key is read from the card once per `Context`.
     pub fn management_key_for_write(&self) -> Result<Option<String>> {
         if let Some(ref k) = self.management_key {
             return Ok(Some(k.clone()));
         }
         if self.pin_protected {
+            if let Some(ref k) = *self.pin_protected_key.borrow() {
+                return Ok(Some(k.as_str().to_owned()));
+            }
             let pin = self.require_pin()?.ok_or_else(|| {
                 anyhow::anyhow!("PIN required to retrieve PIN-protected management key")
             })?;
@@ -228,6 +242,7 @@ impl Context {
                 self.piv.as_ref(),
                 &pin,
             )?;
+            *self.pin_protected_key.borrow_mut() = Some(Zeroizing::new(key.clone()));
             return Ok(Some(key));
         }
         Ok(None)
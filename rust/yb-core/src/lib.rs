@@ -48,8 +48,8 @@ pub use context::{
 };
 pub use nvm::{scan_nvm, NvmUsage};
 pub use orchestrator::{
-    chunks_needed, collect_blob_chain, fetch_blob, list_blobs, remove_blob, store_blob, BlobInfo,
-    Compression, Encryption, StoreOptions,
+    chunks_needed, collect_blob_chain, fetch_blob, fetch_blob_to, list_blobs, remove_blob,
+    store_blob, BlobInfo, Compression, Encryption, StoreOptions,
 };
 pub use piv::hardware::HardwarePiv;
 #[cfg(any(feature = "virtual-piv", feature = "test-utils"))]
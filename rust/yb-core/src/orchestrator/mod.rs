@@ -8,7 +8,7 @@
 //! - [`types`]       — `Encryption`, `Compression`, `StoreOptions`, `BlobInfo`, constants
 //! - [`compression`] — compress/decompress/encrypt pipeline
 //! - [`signature`]   — signature trailer (spec 0017) and chain assembly
-//! - this module     — `store_blob`, `fetch_blob`, `remove_blob`, `list_blobs`
+//! - this module     — `store_blob`, `fetch_blob`, `fetch_blob_to`, `remove_blob`, `list_blobs`
 
 mod compression;
 mod signature;
@@ -22,6 +22,7 @@ use crate::crypto;
 use crate::piv::PivBackend;
 use crate::store::{constants::MAX_NAME_LEN, Object, ObjectParams, Store};
 use anyhow::{bail, Context, Result};
+use std::io::Write;
 
 use compression::{compress_and_encrypt, decompress_payload};
 use signature::append_signature_trailer;
@@ -180,14 +181,11 @@ pub fn fetch_blob(
     let is_compressed = head.is_compressed;
     let key_slot = head.blob_key_slot;
 
-    // Concatenate all chunk payloads.
-    let chain = store.chunk_chain(head.index);
-    let mut data: Vec<u8> = Vec::new();
-    for idx in chain {
-        data.extend_from_slice(&store.objects[idx as usize].payload);
+    // Concatenate chunk payloads into a buffer sized for the blob.
+    let mut data: Vec<u8> = Vec::with_capacity(head.blob_size as usize);
+    for payload in blob_payloads(store, head) {
+        data.extend_from_slice(payload);
     }
-    // Trim to blob_size (payload region may have trailing zeros).
-    data.truncate(head.blob_size as usize);
 
     let payload = if is_encrypted {
         if pin.is_none() {
@@ -207,6 +205,67 @@ pub fn fetch_blob(
     }
 }
 
+/// Write a blob's content to the writer returned by `open`.  Returns the
+/// number of bytes written, or None if not found.
+///
+/// Plain blobs (neither encrypted nor compressed) are streamed chunk by chunk
+/// straight from the store; the others need the whole payload to decrypt or
+/// decompress, so they go through [`fetch_blob`].  `open` is only called once
+/// the content is ready, so a failed fetch never creates or truncates the
+/// output.
+pub fn fetch_blob_to<W: Write>(
+    store: &Store,
+    piv: &dyn PivBackend,
+    reader: &str,
+    name: &str,
+    pin: Option<&str>,
+    debug: bool,
+    open: impl FnOnce() -> std::io::Result<W>,
+) -> Result<Option<usize>> {
+    let head = match store.find_head(name) {
+        None => return Ok(None),
+        Some(h) => h,
+    };
+
+    if head.is_encrypted() || head.is_compressed {
+        let data = match fetch_blob(store, piv, reader, name, pin, debug)? {
+            None => return Ok(None),
+            Some(d) => d,
+        };
+        let mut out = open()?;
+        out.write_all(&data)?;
+        out.flush()?;
+        return Ok(Some(data.len()));
+    }
+
+    let mut out = open()?;
+    let mut written = 0;
+    for payload in blob_payloads(store, head) {
+        out.write_all(payload)?;
+        written += payload.len();
+    }
+    out.flush()?;
+    Ok(Some(written))
+}
+
+/// The stored bytes of a blob: its chunk payloads in chain order, cut at
+/// `blob_size` (the payload region may have trailing zeros).
+fn blob_payloads<'a>(store: &'a Store, head: &Object) -> impl Iterator<Item = &'a [u8]> {
+    let mut remaining = head.blob_size as usize;
+    store
+        .chunk_chain(head.index)
+        .into_iter()
+        .map_while(move |idx| {
+            if remaining == 0 {
+                return None;
+            }
+            let payload = &store.objects[idx as usize].payload;
+            let take = payload.len().min(remaining);
+            remaining -= take;
+            Some(&payload[..take])
+        })
+}
+
 // ---------------------------------------------------------------------------
 // remove_blob
 // ---------------------------------------------------------------------------
@@ -378,4 +437,70 @@ mod tests {
         // Store must be unchanged — still two blobs.
         assert_eq!(list_blobs(&store).len(), 2, "store must be unmodified");
     }
+
+    /// fetch_blob and the streaming path of fetch_blob_to return the same
+    /// bytes for a multi-chunk blob, cut at blob_size.
+    #[test]
+    fn fetch_blob_to_matches_fetch_blob() {
+        use crate::piv::VirtualPiv;
+        use crate::store::Store;
+        use std::path::Path;
+
+        let fixture = Path::new(env!("CARGO_MANIFEST_DIR")).join("tests/fixtures/with_key.yaml");
+        let piv = VirtualPiv::from_fixture(&fixture).unwrap();
+        let mgmt = "010203040506070801020304050607080102030405060708";
+        let reader = piv.reader_name();
+
+        let mut store = Store::format(&reader, &piv, 4, 0x82, Some(mgmt), None).unwrap();
+        // Spans three chunks, the last one partly filled.
+        let data: Vec<u8> = (0..2 * store.object_size + 100)
+            .map(|i| (i % 251) as u8 + 1)
+            .collect();
+        for (name, payload) in [("big", &data[..]), ("small", &b"xyz"[..])] {
+            let ok = store_blob(
+                &mut store,
+                &piv,
+                name,
+                payload,
+                StoreOptions {
+                    encryption: Encryption::None,
+                    compression: Compression::None,
+                },
+                Some(mgmt),
+                None,
+            )
+            .unwrap();
+            assert!(ok, "'{name}' should fit");
+
+            let fetched = fetch_blob(&store, &piv, &reader, name, None, false)
+                .unwrap()
+                .unwrap();
+            assert_eq!(fetched, payload);
+
+            let mut streamed = Vec::new();
+            let len = fetch_blob_to(&store, &piv, &reader, name, None, false, || {
+                Ok(&mut streamed)
+            })
+            .unwrap();
+            assert_eq!(len, Some(payload.len()));
+            assert_eq!(streamed, payload);
+        }
+        assert_eq!(
+            store
+                .chunk_chain(store.find_head("big").unwrap().index)
+                .len(),
+            3
+        );
+
+        let missing = fetch_blob_to(
+            &store,
+            &piv,
+            &reader,
+            "nope",
+            None,
+            false,
+            || Ok(Vec::new()),
+        );
+        assert_eq!(missing.unwrap(), None);
+    }
 }
@@ -7,7 +7,7 @@
 
 use super::{session, tlv, DeviceInfo, FlashHandle, PivBackend};
 use anyhow::{bail, Context, Result};
-use session::{serial_from_reader, version_from_reader, PcscSession, SELECT_PIV};
+use session::{card_info_from_reader, PcscSession, SELECT_PIV};
 use std::sync::{
     atomic::{AtomicBool, Ordering},
     Arc,
@@ -46,10 +46,19 @@ impl PivBackend for HardwarePiv {
 
     fn list_devices(&self) -> Result<Vec<DeviceInfo>> {
         let readers = self.list_readers()?;
+        // Query the readers concurrently: each is a separate card, so their
+        // round-trips overlap and N keys enumerate in about the time of one.
+        let infos: Vec<_> = std::thread::scope(|s| {
+            let handles: Vec<_> = readers
+                .iter()
+                .map(|reader| s.spawn(move || card_info_from_reader(reader)))
+                .collect();
+            handles.into_iter().map(|h| h.join()).collect()
+        });
         let mut devices = Vec::new();
-        for reader in &readers {
-            if let Ok(serial) = serial_from_reader(reader) {
-                let version = version_from_reader(reader).unwrap_or_else(|| "unknown".to_owned());
+        for (reader, info) in readers.iter().zip(infos) {
+            if let Ok(Ok((serial, version))) = info {
+                let version = version.unwrap_or_else(|| "unknown".to_owned());
                 devices.push(DeviceInfo {
                     serial,
                     version,
@@ -65,6 +74,17 @@ impl PivBackend for HardwarePiv {
         session.get_data(id)
     }
 
+    fn read_objects(&self, reader: &str, ids: &[u32]) -> Result<Vec<Vec<u8>>> {
+        let mut session = PcscSession::open(reader)?;
+        ids.iter()
+            .map(|&id| {
+                session
+                    .get_data(id)
+                    .with_context(|| format!("reading object 0x{id:06x}"))
+            })
+            .collect()
+    }
+
     fn write_object(
         &self,
         reader: &str,
@@ -88,6 +108,14 @@ impl PivBackend for HardwarePiv {
         session.transmit_check(apdu, "send_apdu")
     }
 
+    fn send_apdus(&self, reader: &str, apdus: &[&[u8]]) -> Result<Vec<Vec<u8>>> {
+        let mut session = PcscSession::open(reader)?;
+        apdus
+            .iter()
+            .map(|apdu| session.transmit_check(apdu, "send_apdus"))
+            .collect()
+    }
+
     fn ecdh(
         &self,
         reader: &str,
@@ -128,10 +156,8 @@ impl PivBackend for HardwarePiv {
         // Cert TLV: 53 <len> [ 70 <len> <DER cert> 71 01 00 FE 00 ]
         // get_data already stripped the outer 53 wrapper.
         // Now parse the inner TLV for tag 0x70.
-        let inner = crate::auxiliaries::parse_tlv_flat(&raw);
-        inner
-            .get(&0x70)
-            .cloned()
+        crate::auxiliaries::tlv_find(&raw, 0x70)
+            .map(<[u8]>::to_vec)
             .ok_or_else(|| anyhow::anyhow!("cert object for slot 0x{slot:02x}: missing tag 0x70"))
     }
 
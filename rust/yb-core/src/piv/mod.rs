@@ -12,7 +12,7 @@ pub mod virtual_piv;
 
 pub use virtual_piv::VirtualPiv;
 
-use anyhow::Result;
+use anyhow::{Context, Result};
 
 // ---------------------------------------------------------------------------
 // FlashHandle — returned by PivBackend::start_flash
@@ -51,6 +51,20 @@ pub trait PivBackend: Send + Sync {
     /// Read a PIV data object by its numeric ID.
     fn read_object(&self, reader: &str, id: u32) -> Result<Vec<u8>>;
 
+    /// Read several PIV data objects, in order.
+    ///
+    /// The default implementation calls `read_object` once per ID; hardware
+    /// backends should override it to reuse a single card session, since
+    /// connecting and selecting the applet costs more than the GET DATA.
+    fn read_objects(&self, reader: &str, ids: &[u32]) -> Result<Vec<Vec<u8>>> {
+        ids.iter()
+            .map(|&id| {
+                self.read_object(reader, id)
+                    .with_context(|| format!("reading object 0x{id:06x}"))
+            })
+            .collect()
+    }
+
     /// Write a PIV data object.
     ///
     /// If `management_key` is Some, it is used directly for authentication.
@@ -72,6 +86,18 @@ pub trait PivBackend: Send + Sync {
     /// Returns Err if the card returns a non-9000 status.
     fn send_apdu(&self, reader: &str, apdu: &[u8]) -> Result<Vec<u8>>;
 
+    /// Send several raw APDUs in order and return their responses.
+    ///
+    /// Fails on the first non-9000 status.  The default implementation calls
+    /// `send_apdu` once per APDU; hardware backends should override it to
+    /// issue them all within a single card session.
+    fn send_apdus(&self, reader: &str, apdus: &[&[u8]]) -> Result<Vec<Vec<u8>>> {
+        apdus
+            .iter()
+            .map(|apdu| self.send_apdu(reader, apdu))
+            .collect()
+    }
+
     /// ECDH key agreement: given the peer's uncompressed P-256 point (65 bytes),
     /// return the shared secret point (65 bytes).
     fn ecdh(&self, reader: &str, slot: u8, peer_point: &[u8], pin: Option<&str>)
@@ -5,7 +5,7 @@
 //! PIN verification and management-key authentication.
 
 use super::transport::PcscSession;
-use crate::auxiliaries::{extract_pin_protected_key, OBJ_PRINTED};
+use crate::auxiliaries::{pin_protected_key_bytes, OBJ_PRINTED};
 use crate::piv::tlv::{crypto_ecb, encode_length, encode_tlv, EcbDir};
 use anyhow::{bail, Context, Result};
 use subtle::ConstantTimeEq;
@@ -43,6 +43,11 @@ impl PcscSession {
     /// `key_hex` is 48 hex chars for 3DES, or 32/48/64 for AES-128/192/256.
     pub(crate) fn authenticate_management_key(&mut self, key_hex: &str) -> Result<()> {
         let key_bytes = hex::decode(key_hex).context("decoding management key")?;
+        self.authenticate_management_key_bytes(&key_bytes)
+    }
+
+    /// Same as [`authenticate_management_key`], with the key as raw bytes.
+    fn authenticate_management_key_bytes(&mut self, key_bytes: &[u8]) -> Result<()> {
         let (p1, block_size): (u8, usize) = match key_bytes.len() {
             24 => (0x03, 8),  // 3DES
             16 => (0x08, 16), // AES-128
@@ -59,7 +64,7 @@ impl PcscSession {
         let witness_enc = tlv_get(&outer, 0x80, "MGMT AUTH step1")?;
 
         // Step 2: decrypt witness, generate our own challenge, send both.
-        let witness_dec = crypto_ecb(&key_bytes, &witness_enc, block_size, EcbDir::Decrypt)?;
+        let witness_dec = crypto_ecb(key_bytes, &witness_enc, block_size, EcbDir::Decrypt)?;
         let challenge: Vec<u8> = (0..block_size).map(|_| rand::random::<u8>()).collect();
 
         // Build data: 7C <len> [ 80 <len> <decrypted-witness> 81 <len> <challenge> ]
@@ -77,7 +82,7 @@ impl PcscSession {
         let outer_r = tlv_get(&resp2, 0x7C, "MGMT AUTH step2")?;
         let challenge_resp = tlv_get(&outer_r, 0x82, "MGMT AUTH step2")?;
 
-        let challenge_enc = crypto_ecb(&key_bytes, &challenge, block_size, EcbDir::Encrypt)?;
+        let challenge_enc = crypto_ecb(key_bytes, &challenge, block_size, EcbDir::Encrypt)?;
         if challenge_enc.ct_eq(&challenge_resp).unwrap_u8() == 0 {
             bail!("management key authentication failed: card response mismatch");
         }
@@ -85,21 +90,19 @@ impl PcscSession {
         Ok(())
     }
 
-    /// Resolve the management key from three sources, in priority order:
-    /// 1. Explicit `management_key` argument.
-    /// 2. PIN-protected object on the device (requires verifying `pin` first).
+    /// Resolve the management key and authenticate, in priority order:
+    /// 1. Explicit `management_key` argument (hex).
+    /// 2. PIN-protected object on the device (requires verifying `pin` first);
+    ///    the key bytes read from it are used directly.
     /// 3. Fails with a helpful message if neither is available.
-    ///
-    /// Does **not** authenticate — call [`authenticate_management_key`] with
-    /// the returned key to complete the process.
-    pub(crate) fn resolve_management_key(
+    pub(crate) fn resolve_and_auth_management_key(
         &mut self,
         management_key: Option<&str>,
         pin: Option<&str>,
         caller: &str,
-    ) -> Result<String> {
+    ) -> Result<()> {
         if let Some(k) = management_key {
-            return Ok(k.to_owned());
+            return self.authenticate_management_key(k);
         }
         if let Some(p) = pin {
             self.verify_pin(p)?;
@@ -109,20 +112,8 @@ impl PcscSession {
                      supply it via YB_MANAGEMENT_KEY or the --key flag"
                 )
             })?;
-            return extract_pin_protected_key(&raw);
+            return self.authenticate_management_key_bytes(pin_protected_key_bytes(&raw)?);
         }
         bail!("{caller}: management_key or pin required");
     }
-
-    /// Resolve the management key and authenticate in one step.
-    pub(crate) fn resolve_and_auth_management_key(
-        &mut self,
-        management_key: Option<&str>,
-        pin: Option<&str>,
-        caller: &str,
-    ) -> Result<String> {
-        let key = self.resolve_management_key(management_key, pin, caller)?;
-        self.authenticate_management_key(&key)?;
-        Ok(key)
-    }
 }
@@ -5,7 +5,7 @@
 //! Crypto operations: GENERAL AUTHENTICATE, key generation, DER/raw ECDSA conversion.
 
 use super::transport::PcscSession;
-use crate::auxiliaries::parse_tlv_flat;
+use crate::auxiliaries::tlv_find;
 use crate::piv::tlv::{encode_length, encode_tlv, parse_gen_key_response};
 use anyhow::Result;
 
@@ -96,15 +96,13 @@ pub(crate) fn der_ecdsa_to_raw(der: &[u8]) -> Result<[u8; 64]> {
 // Private ASN.1 / TLV helpers
 // ---------------------------------------------------------------------------
 
-/// Extract one tag from a flat TLV map, returning an owned copy of the value.
+/// Extract one tag from a flat TLV sequence, returning an owned copy of the value.
 ///
-/// Equivalent to `parse_tlv_flat(buf).get(&tag).ok_or_else(|| …)?.clone()`
-/// but with a uniform error message.
+/// Like `tlv_find`, with a uniform error message when the tag is missing.
 pub(crate) fn tlv_get(buf: &[u8], tag: u8, label: &str) -> Result<Vec<u8>> {
-    parse_tlv_flat(buf)
-        .get(&tag)
+    tlv_find(buf, tag)
+        .map(<[u8]>::to_vec)
         .ok_or_else(|| anyhow::anyhow!("{label}: missing tag 0x{tag:02x}"))
-        .cloned()
 }
 
 /// Read one TLV element (tag 1 byte, length 1 byte assumed < 128), return
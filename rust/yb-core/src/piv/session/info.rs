@@ -7,27 +7,28 @@
 use super::transport::{connect_reader_mode, SELECT_PIV};
 use anyhow::{bail, Result};
 
-fn query_card_apdu(reader: &str, query: &[u8]) -> Result<Vec<u8>> {
+const GET_SERIAL: [u8; 5] = [0x00, 0xF8, 0x00, 0x00, 0x00];
+const GET_VERSION: [u8; 5] = [0x00, 0xFD, 0x00, 0x00, 0x00];
+
+/// Query serial number and firmware version over one card connection.
+///
+/// Fails if the card does not answer GET SERIAL (i.e. it is not a YubiKey);
+/// the version is `None` if GET VERSION fails.
+pub(crate) fn card_info_from_reader(reader: &str) -> Result<(u32, Option<String>)> {
     let ctx = pcsc::Context::establish(pcsc::Scope::User)?;
     let card = connect_reader_mode(&ctx, reader, pcsc::ShareMode::Shared)?;
     let mut buf = vec![0u8; 258];
     let _ = card.transmit(SELECT_PIV, &mut buf)?;
-    let resp = card.transmit(query, &mut buf)?;
-    Ok(resp.to_vec())
-}
 
-pub(crate) fn serial_from_reader(reader: &str) -> Result<u32> {
-    let resp = query_card_apdu(reader, &[0x00, 0xF8, 0x00, 0x00, 0x00])?;
+    let resp = card.transmit(&GET_SERIAL, &mut buf)?;
     if resp.len() < 4 {
         bail!("GET_SERIAL response too short");
     }
-    Ok(u32::from_be_bytes(resp[0..4].try_into().unwrap()))
-}
+    let serial = u32::from_be_bytes(resp[0..4].try_into().unwrap());
 
-pub(crate) fn version_from_reader(reader: &str) -> Option<String> {
-    let resp = query_card_apdu(reader, &[0x00, 0xFD, 0x00, 0x00, 0x00]).ok()?;
-    if resp.len() < 3 {
-        return None;
-    }
-    Some(format!("{}.{}.{}", resp[0], resp[1], resp[2]))
+    let version = match card.transmit(&GET_VERSION, &mut buf) {
+        Ok(resp) if resp.len() >= 3 => Some(format!("{}.{}.{}", resp[0], resp[1], resp[2])),
+        _ => None,
+    };
+    Ok((serial, version))
 }
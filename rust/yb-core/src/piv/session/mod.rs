@@ -17,5 +17,5 @@ mod info;
 mod objects;
 mod transport;
 
-pub(crate) use info::{serial_from_reader, version_from_reader};
+pub(crate) use info::card_info_from_reader;
 pub(crate) use transport::{PcscSession, SELECT_PIV};
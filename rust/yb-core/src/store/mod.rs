@@ -372,13 +372,17 @@ impl Store {
         let object_size = raw.len();
         let store_key_slot = first.store_key_slot;
 
-        let mut objects = vec![first];
-        for i in 1..object_count {
-            let id = OBJECT_ID_ZERO + i as u32;
-            let raw = piv
-                .read_object(reader, id)
-                .with_context(|| format!("reading object 0x{id:06x}"))?;
-            let obj = Object::from_bytes(i, &raw).with_context(|| format!("parsing object {i}"))?;
+        // Fetch the remaining objects in one batch (a single card session on
+        // hardware), then parse.
+        let ids: Vec<u32> = (1..object_count)
+            .map(|i| OBJECT_ID_ZERO + i as u32)
+            .collect();
+        let raws = piv.read_objects(reader, &ids)?;
+
+        let mut objects = Vec::with_capacity(object_count as usize);
+        objects.push(first);
+        for (i, raw) in (1..object_count).zip(&raws) {
+            let obj = Object::from_bytes(i, raw).with_context(|| format!("parsing object {i}"))?;
             objects.push(obj);
         }
 
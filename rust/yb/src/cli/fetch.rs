@@ -5,7 +5,8 @@
 use anyhow::{bail, Result};
 use clap::Args;
 use clap_complete::engine::{ArgValueCompleter, PathCompleter};
-use std::io::Write as _;
+use std::fs::File;
+use std::io::BufWriter;
 use std::path::PathBuf;
 use yb_core::orchestrator;
 use yb_core::{store::Store, Context};
@@ -53,10 +54,12 @@ pub fn run(ctx: &Context, args: &FetchArgs) -> Result<()> {
     }
 
     let store = Store::from_device(&ctx.reader, ctx.piv.as_ref())?;
-    let all_blobs = orchestrator::list_blobs(&store);
 
     // Resolve patterns to matched blob names.
-    let all_blob_names: Vec<String> = all_blobs.iter().map(|b| b.name.clone()).collect();
+    let all_blob_names: Vec<String> = orchestrator::list_blobs(&store)
+        .into_iter()
+        .map(|b| b.name)
+        .collect();
     let matched = resolve_patterns(&args.patterns, &all_blob_names, false)?;
 
     // Validate per-match constraints.
@@ -67,45 +70,45 @@ pub fn run(ctx: &Context, args: &FetchArgs) -> Result<()> {
         );
     }
 
-    for name in &matched {
-        let pin = ctx.require_pin()?;
-        let data = orchestrator::fetch_blob(
-            &store,
-            ctx.piv.as_ref(),
-            &ctx.reader,
-            name,
-            pin.as_deref(),
-            ctx.debug,
-        )?
-        .ok_or_else(|| anyhow::anyhow!("blob '{}' not found", name))?;
+    // Only prompt for the PIN when some requested blob is encrypted.
+    let needs_pin = matched
+        .iter()
+        .any(|name| store.find_head(name).is_some_and(|h| h.is_encrypted()));
+    let pin = if needs_pin { ctx.require_pin()? } else { None };
 
+    for name in &matched {
         if args.stdout {
-            std::io::stdout().write_all(&data)?;
-        } else if let Some(ref path) = args.output {
-            std::fs::write(path, &data)?;
-            if !ctx.quiet {
-                eprintln!(
-                    "Fetched '{}' → {} ({} bytes)",
-                    name,
-                    path.display(),
-                    data.len()
-                );
-            }
+            orchestrator::fetch_blob_to(
+                &store,
+                ctx.piv.as_ref(),
+                &ctx.reader,
+                name,
+                pin.as_deref(),
+                ctx.debug,
+                || Ok(std::io::stdout().lock()),
+            )?
+            .ok_or_else(|| anyhow::anyhow!("blob '{}' not found", name))?;
         } else {
-            // Save to file: use output_dir / blob_name.
-            let dest = if let Some(ref dir) = args.output_dir {
+            let dest = if let Some(ref path) = args.output {
+                path.clone()
+            } else if let Some(ref dir) = args.output_dir {
+                // Save to file: use output_dir / blob_name.
                 dir.join(name)
             } else {
                 PathBuf::from(name)
             };
-            std::fs::write(&dest, &data)?;
+            let len = orchestrator::fetch_blob_to(
+                &store,
+                ctx.piv.as_ref(),
+                &ctx.reader,
+                name,
+                pin.as_deref(),
+                ctx.debug,
+                || Ok(BufWriter::new(File::create(&dest)?)),
+            )?
+            .ok_or_else(|| anyhow::anyhow!("blob '{}' not found", name))?;
             if !ctx.quiet {
-                eprintln!(
-                    "Fetched '{}' → {} ({} bytes)",
-                    name,
-                    dest.display(),
-                    data.len()
-                );
+                eprintln!("Fetched '{}' → {} ({} bytes)", name, dest.display(), len);
             }
         }
     }
@@ -2,11 +2,14 @@
 //
 // SPDX-License-Identifier: MIT
 
+use std::sync::LazyLock;
+
 use anyhow::Result;
-use chrono::{DateTime, Duration, Local, Utc};
+use chrono::format::{Item, StrftimeItems};
+use chrono::{DateTime, Duration, Local, TimeZone};
 use clap::Args;
 use clap_complete::engine::ArgValueCompleter;
-use globset::GlobBuilder;
+use globset::{GlobBuilder, GlobMatcher};
 use yb_core::{orchestrator, parse_ec_public_key_from_cert_der, store::Store, Context};
 
 use crate::cli::util::{check_blob_signature, quote_name, SigVerdict};
@@ -36,16 +39,8 @@ pub struct ListArgs {
 }
 
 pub fn run(ctx: &Context, args: &ListArgs) -> Result<()> {
-    let matcher = match &args.pattern {
-        Some(pat) => {
-            let glob = GlobBuilder::new(pat)
-                .case_insensitive(false)
-                .build()?
-                .compile_matcher();
-            Some(glob)
-        }
-        None => None,
-    };
+    let matcher = args.pattern.as_deref().map(NameFilter::new).transpose()?;
+    let selected = |name: &str| matcher.as_ref().is_none_or(|m| m.is_match(name));
 
     let store = Store::from_device(&ctx.reader, ctx.piv.as_ref())?;
 
@@ -60,8 +55,12 @@ pub fn run(ctx: &Context, args: &ListArgs) -> Result<()> {
             VerifyingKey::from(&pk)
         });
 
-    // Build a verdict map keyed by blob name.
-    let heads: Vec<_> = store.objects.iter().filter(|o| o.is_head()).collect();
+    // Build a verdict map keyed by blob name, checking only the blobs listed.
+    let heads: Vec<_> = store
+        .objects
+        .iter()
+        .filter(|o| o.is_head() && selected(&o.blob_name))
+        .collect();
     let mut verdict_map: std::collections::HashMap<&str, SigVerdict> =
         std::collections::HashMap::new();
     for head in &heads {
@@ -72,9 +71,7 @@ pub fn run(ctx: &Context, args: &ListArgs) -> Result<()> {
     let mut blobs = orchestrator::list_blobs(&store);
 
     // Filter.
-    if let Some(ref m) = matcher {
-        blobs.retain(|b| m.is_match(&b.name));
-    }
+    blobs.retain(|b| selected(&b.name));
 
     // Sort.
     if args.sort_time {
@@ -86,6 +83,11 @@ pub fn run(ctx: &Context, args: &ListArgs) -> Result<()> {
         blobs.reverse();
     }
 
+    // Blobs stored together share an mtime: format each distinct one once,
+    // against a single "now".
+    let now = Local::now();
+    let mut dates: std::collections::HashMap<u32, String> = std::collections::HashMap::new();
+
     let mut any_corrupted = false;
     for b in &blobs {
         let corrupted = verdict_map
@@ -99,7 +101,9 @@ pub fn run(ctx: &Context, args: &ListArgs) -> Result<()> {
         let suffix = if corrupted { "  CORRUPTED" } else { "" };
         if args.long {
             let enc_flag = if b.is_encrypted { '-' } else { 'P' };
-            let date = format_mtime(b.mtime);
+            let date = dates
+                .entry(b.mtime)
+                .or_insert_with(|| format_mtime(b.mtime, &now));
             println!(
                 "{enc_flag} {:2}  {}  {:6}  {displayed_name}{suffix}",
                 b.chunk_count, date, b.plain_size,
@@ -116,16 +120,120 @@ pub fn run(ctx: &Context, args: &ListArgs) -> Result<()> {
     Ok(())
 }
 
-fn format_mtime(unix: u32) -> String {
+/// Blob-name filter for `yb list PATTERN`.
+///
+/// Literal names and `prefix*` patterns, by far the most common, are
+/// compared directly instead of going through a compiled glob.
+enum NameFilter {
+    Exact(String),
+    Prefix(String),
+    Glob(GlobMatcher),
+}
+
+impl NameFilter {
+    fn new(pat: &str) -> Result<Self> {
+        let is_literal = |s: &str| !s.contains(['*', '?', '[', ']', '{', '}', '\\']);
+        if is_literal(pat) {
+            return Ok(Self::Exact(pat.to_owned()));
+        }
+        if let Some(prefix) = pat.strip_suffix('*').filter(|p| is_literal(p)) {
+            return Ok(Self::Prefix(prefix.to_owned()));
+        }
+        let glob = GlobBuilder::new(pat)
+            .case_insensitive(false)
+            .build()?
+            .compile_matcher();
+        Ok(Self::Glob(glob))
+    }
+
+    fn is_match(&self, name: &str) -> bool {
+        match self {
+            Self::Exact(s) => name == s,
+            Self::Prefix(p) => name.starts_with(p.as_str()),
+            Self::Glob(g) => g.is_match(name),
+        }
+    }
+}
+
+// `ls -l` style date formats, parsed once instead of on every row.
+static RECENT_FMT: LazyLock<Vec<Item<'static>>> =
+    LazyLock::new(|| StrftimeItems::new("%b %e %H:%M").collect());
+static OLD_FMT: LazyLock<Vec<Item<'static>>> =
+    LazyLock::new(|| StrftimeItems::new("%b %e  %Y").collect());
+
+fn format_mtime(unix: u32, now: &DateTime<Local>) -> String {
     if unix == 0 {
         return "            ".to_owned();
     }
-    let dt: DateTime<Local> =
-        DateTime::from(DateTime::<Utc>::from_timestamp(unix as i64, 0).unwrap());
-    let now = Local::now();
-    if now.signed_duration_since(dt) < Duration::days(180) {
-        dt.format("%b %e %H:%M").to_string()
+    // Straight to local time, no intermediate UTC DateTime.
+    let dt = Local.timestamp_opt(unix as i64, 0).unwrap();
+    let items = if now.signed_duration_since(dt) < Duration::days(180) {
+        &RECENT_FMT
     } else {
-        dt.format("%b %e  %Y").to_string()
+        &OLD_FMT
+    };
+    dt.format_with_items(items.iter()).to_string()
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    const NAMES: &[&str] = &[
+        "", "foo", "foobar", "foo/bar", "bar", "a/b", "f*x", "a{b", "[x]", "x\\y",
+    ];
+
+    /// Assert that `pat` takes the expected path and agrees with globset on
+    /// every sample name.
+    fn check(pat: &str, kind: &str) {
+        let filter = NameFilter::new(pat).unwrap();
+        let actual = match filter {
+            NameFilter::Exact(_) => "exact",
+            NameFilter::Prefix(_) => "prefix",
+            NameFilter::Glob(_) => "glob",
+        };
+        assert_eq!(actual, kind, "pattern {pat:?}");
+        let glob = GlobBuilder::new(pat)
+            .case_insensitive(false)
+            .build()
+            .unwrap()
+            .compile_matcher();
+        for name in NAMES {
+            assert_eq!(
+                filter.is_match(name),
+                glob.is_match(name),
+                "pattern {pat:?}, name {name:?}"
+            );
+        }
+    }
+
+    #[test]
+    fn literal_names_match_exactly() {
+        check("foo", "exact");
+        check("foobar", "exact");
+        check("a/b", "exact");
+        check("missing", "exact");
+    }
+
+    #[test]
+    fn trailing_star_is_a_prefix() {
+        check("foo*", "prefix");
+        check("a/*", "prefix");
+        check("*", "prefix");
+    }
+
+    #[test]
+    fn metacharacters_fall_through_to_glob() {
+        check("*bar", "glob");
+        check("f?o", "glob");
+        check("foo\\*", "glob");
+        check("x\\\\y", "glob");
+        check("[fb]*", "glob");
+        check("\\[x]", "glob");
+        check("{foo,bar}", "glob");
+        check("f*x*", "glob");
+        check("{a,f}*", "glob");
+        // A literal prefix is never guessed from an invalid glob.
+        assert!(NameFilter::new("a{b*").is_err());
     }
 }
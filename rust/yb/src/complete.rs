@@ -6,9 +6,11 @@
 
 use clap_complete::engine::CompletionCandidate;
 use std::ffi::OsStr;
+use std::io::Write as _;
+use std::path::PathBuf;
 use std::sync::Arc;
+use std::time::Duration;
 use yb_core::{
-    orchestrator,
     piv::{hardware::HardwarePiv, VirtualPiv},
     store::Store,
     PivBackend,
@@ -39,25 +41,251 @@ pub fn complete_serials(incomplete: &OsStr) -> Vec<CompletionCandidate> {
         .collect()
 }
 
+/// How long cached blob names are trusted.  Commands that modify the store
+/// drop the cache for their reader, so this only bounds staleness when a key
+/// is swapped or written to by another tool.
+const BLOB_NAME_CACHE_MAX_AGE: Duration = Duration::from_secs(30);
+
 /// Complete blob names from the YubiKey store.
 ///
-/// Uses the first connected device.  All errors are silently swallowed —
-/// a failed completion is better than an error message interrupting the shell.
+/// Uses the first reader holding a readable store.  All errors are silently
+/// swallowed — a failed completion is better than an error message
+/// interrupting the shell.
+///
+/// Readers are listed rather than devices: `list_devices` queries the serial
+/// and firmware version of every key, which completion never shows.  Names
+/// read from a store are cached on disk per reader, so repeated `<TAB>`
+/// presses skip the card entirely.
 pub fn complete_blob_names(incomplete: &OsStr) -> Vec<CompletionCandidate> {
     let piv = make_piv();
-    let Ok(devices) = piv.list_devices() else {
+    let Ok(readers) = piv.list_readers() else {
         return vec![];
     };
-    let Some(device) = devices.into_iter().next() else {
-        return vec![];
-    };
-    let Ok(store) = Store::from_device(&device.reader, piv.as_ref()) else {
+    let Some(names) = first_store_names(&readers, |reader| {
+        let store = Store::from_device(reader, piv.as_ref()).ok()?;
+        // Only the names are needed: skip list_blobs, which also walks
+        // every chunk chain.
+        let mut names: Vec<String> = store
+            .objects
+            .into_iter()
+            .filter(|o| o.is_head())
+            .map(|o| o.blob_name)
+            .collect();
+        names.sort_unstable();
+        Some(names)
+    }) else {
         return vec![];
     };
     let prefix = incomplete.to_string_lossy();
-    orchestrator::list_blobs(&store)
+    names
         .into_iter()
-        .filter(|b| b.name.starts_with(prefix.as_ref()))
-        .map(|b| CompletionCandidate::new(b.name))
+        .filter(|name| name.starts_with(prefix.as_ref()))
+        .map(CompletionCandidate::new)
         .collect()
 }
+
+/// Blob names of the first reader holding a readable store.
+///
+/// Readers are tried in order, each one's cache before `load` reads its
+/// store, so a cache hit and a refresh always settle on the same reader.
+fn first_store_names(
+    readers: &[String],
+    mut load: impl FnMut(&str) -> Option<Vec<String>>,
+) -> Option<Vec<String>> {
+    readers.iter().find_map(|reader| {
+        if let Some(names) = read_cached_names(reader) {
+            return Some(names);
+        }
+        let names = load(reader)?;
+        write_cached_names(reader, &names);
+        Some(names)
+    })
+}
+
+/// Drop the cached blob names for `reader`, after its store was modified.
+pub fn invalidate_blob_name_cache(reader: &str) {
+    if let Some(path) = cache_path(reader) {
+        let _ = std::fs::remove_file(path);
+    }
+}
+
+/// `$XDG_CACHE_HOME/yb/completions/<reader>`, or `None` when there is no
+/// cache directory or a fixture is in use.
+fn cache_path(reader: &str) -> Option<PathBuf> {
+    if std::env::var_os("YB_FIXTURE").is_some() {
+        return None;
+    }
+    let base = match std::env::var_os("XDG_CACHE_HOME") {
+        Some(dir) if !dir.is_empty() => PathBuf::from(dir),
+        _ => PathBuf::from(std::env::var_os("HOME")?).join(".cache"),
+    };
+    // Reader names contain spaces and may contain '/'; keep a safe subset.
+    let file: String = reader
+        .chars()
+        .map(|c| if c.is_ascii_alphanumeric() { c } else { '_' })
+        .collect();
+    Some(base.join("yb").join("completions").join(file))
+}
+
+/// Cached names for `reader`, if written less than the max age ago.
+fn read_cached_names(reader: &str) -> Option<Vec<String>> {
+    let path = cache_path(reader)?;
+    let age = std::fs::metadata(&path)
+        .ok()?
+        .modified()
+        .ok()?
+        .elapsed()
+        .ok()?;
+    if age >= BLOB_NAME_CACHE_MAX_AGE {
+        return None;
+    }
+    let text = std::fs::read_to_string(path).ok()?;
+    Some(text.lines().map(str::to_owned).collect())
+}
+
+/// Best-effort atomic write: a temp file in the same directory, renamed over
+/// the old cache, so a concurrent reader never sees a partial list.
+fn write_cached_names(reader: &str, names: &[String]) {
+    let Some(path) = cache_path(reader) else {
+        return;
+    };
+    let Some(dir) = path.parent() else {
+        return;
+    };
+    if std::fs::create_dir_all(dir).is_err() {
+        return;
+    }
+    let Ok(mut tmp) = tempfile::NamedTempFile::new_in(dir) else {
+        return;
+    };
+    for name in names {
+        if writeln!(tmp, "{name}").is_err() {
+            return;
+        }
+    }
+    let _ = tmp.persist(path);
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::sync::Mutex;
+    use std::time::SystemTime;
+
+    /// The cache location comes from the environment, which is global to
+    /// the test process: tests touching it run one at a time.
+    static ENV_LOCK: Mutex<()> = Mutex::new(());
+
+    fn with_cache_dir(test: impl FnOnce(&std::path::Path)) {
+        let _guard = ENV_LOCK.lock().unwrap_or_else(|e| e.into_inner());
+        let dir = tempfile::tempdir().unwrap();
+        std::env::set_var("XDG_CACHE_HOME", dir.path());
+        std::env::remove_var("YB_FIXTURE");
+        test(dir.path());
+    }
+
+    fn names(list: &[&str]) -> Vec<String> {
+        list.iter().map(|s| s.to_string()).collect()
+    }
+
+    fn readers(list: &[&str]) -> Vec<String> {
+        names(list)
+    }
+
+    #[test]
+    fn cache_is_fresh_until_max_age() {
+        with_cache_dir(|_| {
+            write_cached_names("Reader 00 00", &names(&["a", "b"]));
+            assert_eq!(read_cached_names("Reader 00 00"), Some(names(&["a", "b"])));
+            assert_eq!(read_cached_names("Reader 01 00"), None);
+
+            let old = SystemTime::now() - BLOB_NAME_CACHE_MAX_AGE - Duration::from_secs(1);
+            std::fs::File::options()
+                .write(true)
+                .open(cache_path("Reader 00 00").unwrap())
+                .unwrap()
+                .set_modified(old)
+                .unwrap();
+            assert_eq!(read_cached_names("Reader 00 00"), None);
+        });
+    }
+
+    #[test]
+    fn write_replaces_whole_file() {
+        with_cache_dir(|base| {
+            write_cached_names("Reader 00 00", &names(&["one", "two", "three"]));
+            write_cached_names("Reader 00 00", &names(&["four"]));
+            let dir = base.join("yb").join("completions");
+            let files: Vec<_> = std::fs::read_dir(&dir).unwrap().collect();
+            assert_eq!(files.len(), 1, "no temp file may be left behind");
+            let path = cache_path("Reader 00 00").unwrap();
+            assert_eq!(path.parent(), Some(dir.as_path()));
+            assert_eq!(std::fs::read_to_string(&path).unwrap(), "four\n");
+            #[cfg(unix)]
+            {
+                use std::os::unix::fs::PermissionsExt as _;
+                let mode = std::fs::metadata(&path).unwrap().permissions().mode();
+                assert_eq!(mode & 0o777, 0o600);
+            }
+        });
+    }
+
+    #[test]
+    fn fixture_bypasses_cache() {
+        with_cache_dir(|base| {
+            std::env::set_var("YB_FIXTURE", base.join("fixture.json"));
+            assert_eq!(cache_path("Reader 00 00"), None);
+            write_cached_names("Reader 00 00", &names(&["a"]));
+            std::env::remove_var("YB_FIXTURE");
+            assert!(!base.join("yb").exists());
+        });
+    }
+
+    #[test]
+    fn invalidate_drops_only_that_reader() {
+        with_cache_dir(|_| {
+            write_cached_names("Reader 00 00", &names(&["a"]));
+            write_cached_names("Reader 01 00", &names(&["b"]));
+            invalidate_blob_name_cache("Reader 00 00");
+            assert_eq!(read_cached_names("Reader 00 00"), None);
+            assert_eq!(read_cached_names("Reader 01 00"), Some(names(&["b"])));
+            // Nothing cached: a no-op.
+            invalidate_blob_name_cache("Reader 00 00");
+        });
+    }
+
+    #[test]
+    fn lookup_and_refresh_pick_the_same_reader() {
+        with_cache_dir(|_| {
+            let all = readers(&["Reader 00 00", "Reader 01 00"]);
+            // A fresh cache for the second reader must not win over a
+            // readable store in the first.
+            write_cached_names("Reader 01 00", &names(&["other"]));
+            let mut loaded = vec![];
+            let got = first_store_names(&all, |r| {
+                loaded.push(r.to_owned());
+                Some(names(&["mine"]))
+            });
+            assert_eq!(got, Some(names(&["mine"])));
+            assert_eq!(loaded, vec!["Reader 00 00"]);
+
+            // The refresh was cached for that same reader.
+            let got = first_store_names(&all, |_| panic!("cache should be hit"));
+            assert_eq!(got, Some(names(&["mine"])));
+        });
+    }
+
+    #[test]
+    fn unreadable_readers_are_skipped() {
+        with_cache_dir(|_| {
+            let all = readers(&["Other Reader", "Reader 00 00"]);
+            let got = first_store_names(&all, |r| (r == "Reader 00 00").then(|| names(&["a"])));
+            assert_eq!(got, Some(names(&["a"])));
+            assert_eq!(read_cached_names("Other Reader"), None);
+            assert_eq!(
+                first_store_names(&readers(&["Other Reader"]), |_| None),
+                None
+            );
+        });
+    }
+}
@@ -46,6 +46,9 @@ fn run(cli: Cli) -> Result<()> {
     let (pin, pin_fn) = make_pin_resolver(cli.pin_stdin, cli.pin_deprecated)?;
     let management_key = resolve_management_key(cli.key_deprecated);
     let device_picker = make_device_picker();
+    // Read-only commands that never use the PIN or management key don't pay
+    // for the three GET METADATA round-trips.
+    let skip_default_check = matches!(cli.command, Commands::List(_) | Commands::Fsck(_));
 
     let ctx = Context::new(
         ContextOptions {
@@ -54,6 +57,7 @@ fn run(cli: Cli) -> Result<()> {
             management_key,
             pin,
             allow_defaults: cli.allow_defaults,
+            skip_default_check,
         },
         pin_fn,
         device_picker,
@@ -67,6 +71,10 @@ fn run(cli: Cli) -> Result<()> {
     // lint when that feature is absent.
     #[allow(unused_mut)]
     let mut ctx = ctx;
+    let modifies_store = !matches!(
+        cli.command,
+        Commands::Fetch(_) | Commands::List(_) | Commands::Fsck(_)
+    );
     let result = match cli.command {
         Commands::Format(args) => cli::format::run(&ctx, &args),
         Commands::Store(args) => cli::store::run(&ctx, &args),
@@ -78,6 +86,10 @@ fn run(cli: Cli) -> Result<()> {
         #[cfg(feature = "self-test")]
         Commands::SelfTest(args) => cli::self_test::run(&mut ctx, &args),
     };
+    // Even a failed write may have changed some objects.
+    if modifies_store {
+        yb::complete::invalidate_blob_name_cache(&ctx.reader);
+    }
 
     if let Ok(path) = std::env::var("YB_FIXTURE") {
         ctx.piv.save_fixture(std::path::Path::new(&path))?;